@@ -0,0 +1,175 @@
+"""Local stand-in for the SpeechKit Synthesizer and Recognizer services."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+import random
+import struct
+from collections.abc import AsyncGenerator, AsyncIterator
+from dataclasses import dataclass
+
+import grpc
+import yandex.cloud.ai.stt.v3.stt_pb2 as stt_pb2
+import yandex.cloud.ai.stt.v3.stt_service_pb2_grpc as stt_service_pb2_grpc
+import yandex.cloud.ai.tts.v3.tts_pb2 as tts_pb2
+import yandex.cloud.ai.tts.v3.tts_service_pb2_grpc as tts_service_pb2_grpc
+from grpc import aio
+
+from custom_components.yandex_speechkit.audio import (
+    OGG_BOS,
+    OGG_EOS,
+    build_ogg_page,
+)
+
+SAMPLE_RATE = 22050
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour of the stand-in server."""
+
+    first_chunk_latency: float = 0.15
+    chunk_latency: float = 0.02
+    chunk_size: int = 8192
+    chunks: int = 8
+    partial_every: int = 5
+    recognition_latency: float = 0.1
+    error_rate: float = 0.0
+    error_code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE
+
+
+def fake_audio(container: int, size: int) -> bytes:
+    """Return a silent file of roughly size bytes in a container."""
+    if container == tts_pb2.ContainerAudio.WAV:
+        header = b"RIFF" + struct.pack("<I", 36 + size) + b"WAVE"
+        header += b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16
+        )
+        return header + b"data" + struct.pack("<I", size) + bytes(size)
+
+    if container == tts_pb2.ContainerAudio.OGG_OPUS:
+        serial = random.getrandbits(32)
+        head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+        tags = b"OpusTags" + struct.pack("<I", 4) + b"fake" + bytes(4)
+        pages = [
+            build_ogg_page(OGG_BOS, 0, serial, 0, [head]),
+            build_ogg_page(0, 0, serial, 1, [tags]),
+        ]
+        packets = max(1, size // 60)
+        page_count = -(-packets // 50)
+        for index in range(page_count):
+            count = min(50, packets - index * 50)
+            pages.append(
+                build_ogg_page(
+                    OGG_EOS if index == page_count - 1 else 0,
+                    (index * 50 + count) * 960,
+                    serial,
+                    index + 2,
+                    [bytes(60)] * count,
+                )
+            )
+        return b"".join(pages)
+
+    # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz frames of silence
+    frame = b"\xff\xfb\x90\x64" + bytes(413)
+    return frame * max(1, size // len(frame))
+
+
+async def _maybe_fail(config: FakeServerConfig, context: aio.ServicerContext) -> None:
+    """Abort the call with the configured probability."""
+    if config.error_rate and random.random() < config.error_rate:
+        await context.abort(config.error_code, "Injected failure")
+
+
+class FakeSynthesizer(tts_service_pb2_grpc.SynthesizerServicer):
+    """Return silent audio split into chunks with a configured delay."""
+
+    def __init__(self, config: FakeServerConfig) -> None:
+        """Initialize the servicer."""
+        self._config = config
+
+    async def UtteranceSynthesis(
+        self,
+        request: tts_pb2.UtteranceSynthesisRequest,
+        context: aio.ServicerContext,
+    ) -> AsyncGenerator[tts_pb2.UtteranceSynthesisResponse]:
+        """Stream the synthesized utterance."""
+        config = self._config
+        await _maybe_fail(config, context)
+        size = config.chunk_size * config.chunks
+        if request.output_audio_spec.HasField("raw_audio"):
+            audio = bytes(size)
+        else:
+            audio = fake_audio(
+                request.output_audio_spec.container_audio.container_audio_type, size
+            )
+
+        await asyncio.sleep(config.first_chunk_latency)
+        for offset in range(0, len(audio), config.chunk_size):
+            if offset:
+                await asyncio.sleep(config.chunk_latency)
+            yield tts_pb2.UtteranceSynthesisResponse(
+                audio_chunk=tts_pb2.AudioChunk(
+                    data=audio[offset : offset + config.chunk_size]
+                )
+            )
+
+
+class FakeRecognizer(stt_service_pb2_grpc.RecognizerServicer):
+    """Recognize every stream as the same phrase."""
+
+    def __init__(self, config: FakeServerConfig, text: str = "привет") -> None:
+        """Initialize the servicer."""
+        self._config = config
+        self._text = text
+
+    async def RecognizeStreaming(
+        self,
+        request_iterator: AsyncIterator[stt_pb2.StreamingRequest],
+        context: aio.ServicerContext,
+    ) -> AsyncGenerator[stt_pb2.StreamingResponse]:
+        """Send partial results while audio arrives and a final one at the end."""
+        config = self._config
+        await _maybe_fail(config, context)
+        alternatives = stt_pb2.AlternativeUpdate(
+            alternatives=[stt_pb2.Alternative(text=self._text)]
+        )
+
+        chunks = 0
+        async for request in request_iterator:
+            if request.WhichOneof("Event") != "chunk":
+                continue
+            chunks += 1
+            if config.partial_every and chunks % config.partial_every == 0:
+                yield stt_pb2.StreamingResponse(partial=alternatives)
+
+        await asyncio.sleep(config.recognition_latency)
+        cursors = stt_pb2.AudioCursors(final_index=0)
+        yield stt_pb2.StreamingResponse(audio_cursors=cursors, final=alternatives)
+        yield stt_pb2.StreamingResponse(
+            audio_cursors=cursors, eou_update=stt_pb2.EouUpdate()
+        )
+        yield stt_pb2.StreamingResponse(
+            audio_cursors=cursors,
+            final_refinement=stt_pb2.FinalRefinement(
+                final_index=0, normalized_text=alternatives
+            ),
+        )
+
+
+async def start_fake_server(config: FakeServerConfig) -> tuple[aio.Server, str]:
+    """Start the stand-in server on a free local port, return its address."""
+    server = aio.server()
+    tts_service_pb2_grpc.add_SynthesizerServicer_to_server(
+        FakeSynthesizer(config), server
+    )
+    stt_service_pb2_grpc.add_RecognizerServicer_to_server(
+        FakeRecognizer(config), server
+    )
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    return server, f"127.0.0.1:{port}"
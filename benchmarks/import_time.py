@@ -0,0 +1,90 @@
+"""Measure how long the integration takes to import.
+
+Run from the repository root with Home Assistant and the integration
+requirements installed:
+
+    python -m benchmarks.import_time
+
+Every module set is imported in a fresh interpreter after Home Assistant
+itself has been loaded, so only the cost added by the integration is
+counted. The integration set is what Home Assistant imports on the event
+loop at startup, the gRPC set is what is deferred to the executor until
+a config entry is set up.
+"""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+BASELINE = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.components.stt",
+    "homeassistant.components.tts",
+)
+
+MODULE_SETS = {
+    "integration": (
+        "custom_components.yandex_speechkit",
+        "custom_components.yandex_speechkit.config_flow",
+    ),
+    "grpc": (
+        "grpc",
+        "grpc.aio",
+        "yandex.cloud.ai.stt.v3.stt_pb2",
+        "yandex.cloud.ai.stt.v3.stt_service_pb2_grpc",
+        "yandex.cloud.ai.tts.v3.tts_pb2",
+        "yandex.cloud.ai.tts.v3.tts_service_pb2_grpc",
+    ),
+}
+
+CHILD = """
+import importlib, sys, time
+for module in {baseline!r}:
+    importlib.import_module(module)
+started = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+print(time.perf_counter() - started, "grpc" in sys.modules)
+"""
+
+
+def measure(modules: tuple[str, ...]) -> tuple[float, bool]:
+    """Import modules in a fresh interpreter.
+
+    Returns the import time in seconds and whether grpc got imported.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(baseline=BASELINE, modules=modules)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), output[1] == "True"
+
+
+def main() -> None:
+    """Parse the arguments and report the import times."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for name, modules in MODULE_SETS.items():
+        samples = [measure(modules) for _ in range(args.runs)]
+        median = statistics.median(duration for duration, _ in samples)
+        line = f"{name:<12} median={median * 1000:7.1f}ms"
+        if name == "integration":
+            line += f" imports grpc: {'yes' if samples[0][1] else 'no'}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Benchmark the TTS and STT entities against a local stand-in server.
+
+Run from the repository root with Home Assistant and the integration
+requirements installed:
+
+    python -m benchmarks.run --callers 10 --requests 100
+
+Every run starts an in-process gRPC server implementing the SpeechKit
+Synthesizer and Recognizer services, points the integration channels at
+it and drives the entities with concurrent callers. Latency percentiles,
+throughput, peak RSS and, with --trace-allocations, allocated memory are
+reported for every entity. The tts-stream mode drives the streaming
+path Home Assistant uses for TTS entities and also reports the time to
+the first audio chunk.
+"""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import resource
+import time
+import tracemalloc
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.components.stt import (
+    AudioBitRates,
+    AudioChannels,
+    AudioCodecs,
+    AudioFormats,
+    AudioSampleRates,
+    SpeechMetadata,
+    SpeechResultState,
+)
+from homeassistant.components.tts import (
+    ATTR_AUDIO_OUTPUT,
+    ATTR_VOICE,
+    TTSAudioRequest,
+)
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.yandex_speechkit import YandexSpeechKitData
+from custom_components.yandex_speechkit.channels import YandexSpeechKitChannels
+from custom_components.yandex_speechkit.const import (
+    DEFAULT_LANG,
+    DEFAULT_MAX_CONCURRENT_CALLS,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_VOICE,
+)
+from custom_components.yandex_speechkit.metrics import YandexSpeechKitMetrics
+from custom_components.yandex_speechkit.scheduler import YandexSpeechKitScheduler
+from custom_components.yandex_speechkit.stt import YandexSpeechKitSTTEntity
+from custom_components.yandex_speechkit.tts import YandexSpeechKitTTSEntity
+
+from .fake_server import FakeServerConfig, start_fake_server
+
+MESSAGE = (
+    "Стиральная машина закончила работу. Не забудьте развесить бельё, "
+    "пока оно не помялось."
+)
+STT_SAMPLE_RATE = 16000
+STT_FRAME_MS = 20
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Return a percentile of durations in milliseconds."""
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1] * 1000
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one benchmark."""
+
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    first_chunk: list[float] = field(default_factory=list)
+    errors: int = 0
+    size: int = 0
+    elapsed: float = 0.0
+    allocated: int | None = None
+
+    def report(self) -> str:
+        """Format the result as a table row."""
+        calls = len(self.latencies) + self.errors
+        row = (
+            f"{self.name:<10} calls={calls:<5} errors={self.errors:<4} "
+            f"p50={percentile(self.latencies, 50):7.1f}ms "
+            f"p95={percentile(self.latencies, 95):7.1f}ms "
+            f"p99={percentile(self.latencies, 99):7.1f}ms "
+            f"rate={calls / self.elapsed:7.1f}/s "
+            f"throughput={self.size / self.elapsed / 1024:8.1f}KiB/s"
+        )
+        if self.first_chunk:
+            row += (
+                f" first-chunk p50={percentile(self.first_chunk, 50):.1f}ms"
+                f" p95={percentile(self.first_chunk, 95):.1f}ms"
+            )
+        if self.allocated is not None:
+            row += f" allocated={self.allocated / 1024 / 1024:.1f}MiB"
+        return row
+
+
+async def run_callers(
+    name: str,
+    callers: int,
+    requests: int,
+    call: Callable[[int], Awaitable[int | None]],
+    trace_allocations: bool,
+) -> BenchmarkResult:
+    """Spread requests over concurrent callers and measure every call.
+
+    call returns the number of bytes processed, or None on failure.
+    """
+    result = BenchmarkResult(name)
+    counter = iter(range(requests))
+
+    async def caller() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            size = await call(index)
+            if size is None:
+                result.errors += 1
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.size += size
+
+    if trace_allocations:
+        tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(callers)))
+    result.elapsed = time.perf_counter() - started
+    if trace_allocations:
+        result.allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+async def speech(seconds: float, realtime: bool) -> AsyncGenerator[bytes]:
+    """Yield a tone as 16-bit mono PCM frames."""
+    frame_samples = STT_SAMPLE_RATE * STT_FRAME_MS // 1000
+    step = 2 * math.pi * 440 / STT_SAMPLE_RATE
+    frame = b"".join(
+        int(8000 * math.sin(step * sample)).to_bytes(2, "little", signed=True)
+        for sample in range(frame_samples)
+    )
+    for _ in range(int(seconds * 1000 / STT_FRAME_MS)):
+        if realtime:
+            await asyncio.sleep(STT_FRAME_MS / 1000)
+        else:
+            await asyncio.sleep(0)
+        yield frame
+
+
+def create_config_entry(
+    address: str, options: dict[str, Any], rate_limit: float, max_calls: int
+) -> Any:
+    """Return a stand-in config entry with channels to the local server."""
+    channels = YandexSpeechKitChannels(
+        ["benchmark"], None, tts_endpoints=[address], stt_endpoints=[address]
+    )
+    metrics = YandexSpeechKitMetrics()
+    return SimpleNamespace(
+        entry_id="benchmark",
+        title="Benchmark",
+        options=options,
+        runtime_data=YandexSpeechKitData(
+            channels=channels,
+            cache=None,
+            metrics=metrics,
+            scheduler=YandexSpeechKitScheduler(metrics, rate_limit, max_calls),
+        ),
+    )
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    """Run the selected benchmarks."""
+    server, address = await start_fake_server(
+        FakeServerConfig(
+            first_chunk_latency=args.first_chunk_latency / 1000,
+            chunk_latency=args.chunk_latency / 1000,
+            chunk_size=args.chunk_size,
+            chunks=args.chunks,
+            error_rate=args.error_rate,
+        )
+    )
+    entry = create_config_entry(address, {}, args.rate_limit, args.max_calls)
+    results = []
+
+    try:
+        if args.mode in ("tts", "all"):
+            tts_entity = YandexSpeechKitTTSEntity(entry)
+            options = {ATTR_VOICE: DEFAULT_VOICE, ATTR_AUDIO_OUTPUT: args.container}
+
+            async def synthesize(index: int) -> int | None:
+                message = MESSAGE if args.same_message else f"{index}. {MESSAGE}"
+                _, audio = await tts_entity.async_get_tts_audio(
+                    message, DEFAULT_LANG, options
+                )
+                return None if audio is None else len(audio)
+
+            results.append(
+                await run_callers(
+                    "tts",
+                    args.callers,
+                    args.requests,
+                    synthesize,
+                    args.trace_allocations,
+                )
+            )
+
+        if args.mode in ("tts-stream", "all"):
+            tts_entity = YandexSpeechKitTTSEntity(entry)
+            options = {ATTR_VOICE: DEFAULT_VOICE, ATTR_AUDIO_OUTPUT: args.container}
+            first_chunk: list[float] = []
+
+            async def stream(index: int) -> int | None:
+                message = MESSAGE if args.same_message else f"{index}. {MESSAGE}"
+
+                async def message_gen() -> AsyncGenerator[str]:
+                    # Home Assistant sends a complete message as one chunk
+                    yield message
+
+                started = time.perf_counter()
+                response = await tts_entity.async_stream_tts_audio(
+                    TTSAudioRequest(
+                        language=DEFAULT_LANG,
+                        options=options,
+                        message_gen=message_gen(),
+                    )
+                )
+                size = 0
+                try:
+                    async for chunk in response.data_gen:
+                        if not size:
+                            first_chunk.append(time.perf_counter() - started)
+                        size += len(chunk)
+                except HomeAssistantError:
+                    return None
+                return size
+
+            result = await run_callers(
+                "tts-stream",
+                args.callers,
+                args.requests,
+                stream,
+                args.trace_allocations,
+            )
+            result.first_chunk = first_chunk
+            results.append(result)
+
+        if args.mode in ("stt", "all"):
+            stt_entity = YandexSpeechKitSTTEntity(entry, False)
+            metadata = SpeechMetadata(
+                language=DEFAULT_LANG,
+                format=AudioFormats.WAV,
+                codec=AudioCodecs.PCM,
+                bit_rate=AudioBitRates.BITRATE_16,
+                sample_rate=AudioSampleRates.SAMPLERATE_16000,
+                channel=AudioChannels.CHANNEL_MONO,
+            )
+            audio_size = int(args.speech_seconds * STT_SAMPLE_RATE * 2)
+
+            async def recognize(index: int) -> int | None:
+                result = await stt_entity.async_process_audio_stream(
+                    metadata, speech(args.speech_seconds, args.realtime)
+                )
+                if result.result != SpeechResultState.SUCCESS:
+                    return None
+                return audio_size
+
+            results.append(
+                await run_callers(
+                    "stt",
+                    args.callers,
+                    args.requests,
+                    recognize,
+                    args.trace_allocations,
+                )
+            )
+    finally:
+        await entry.runtime_data.channels.async_close()
+        await server.stop(None)
+
+    for result in results:
+        print(result.report())
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS: {peak_rss / 1024:.1f}MiB")
+    print("metrics:", entry.runtime_data.metrics.as_dict())
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mode", choices=("tts", "tts-stream", "stt", "all"), default="all"
+    )
+    parser.add_argument("--callers", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument(
+        "--container", choices=("wav", "mp3", "ogg", "pcm"), default="mp3"
+    )
+    parser.add_argument(
+        "--same-message",
+        action="store_true",
+        help="synthesize the same message in every call",
+    )
+    parser.add_argument(
+        "--first-chunk-latency", type=float, default=150, help="milliseconds"
+    )
+    parser.add_argument("--chunk-latency", type=float, default=20, help="milliseconds")
+    parser.add_argument("--chunk-size", type=int, default=8192, help="bytes")
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="share of failed calls"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help="requests per second, 0 for no limit",
+    )
+    parser.add_argument("--max-calls", type=int, default=DEFAULT_MAX_CONCURRENT_CALLS)
+    parser.add_argument("--speech-seconds", type=float, default=2)
+    parser.add_argument(
+        "--realtime", action="store_true", help="send STT audio at real-time pace"
+    )
+    parser.add_argument("--trace-allocations", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,173 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+from __future__ import annotations
+
+import importlib
+import shutil
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_API_KEY, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .cache import YandexSpeechKitCache
+from .const import (
+    CONF_API_KEYS,
+    CONF_BREAKER_PROBE_INTERVAL,
+    CONF_BREAKER_THRESHOLD,
+    CONF_CACHE_SIZE,
+    CONF_CACHE_TTL,
+    CONF_ENDPOINT_PROBE_INTERVAL,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEPALIVE_INTERVAL,
+    CONF_MAX_CONCURRENT_CALLS,
+    CONF_RATE_LIMIT,
+    CONF_STT_ENDPOINTS,
+    CONF_TTS_ENDPOINTS,
+    CONF_WARM_UP,
+    DEFAULT_BREAKER_PROBE_INTERVAL,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_ENDPOINT_PROBE_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_KEEPALIVE_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_CALLS,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_WARM_UP,
+    DOMAIN,
+)
+from .metrics import YandexSpeechKitMetrics
+from .scheduler import YandexSpeechKitScheduler
+from .services import async_setup_services
+
+if TYPE_CHECKING:
+    import grpc
+
+    from .channels import YandexSpeechKitChannels
+    from .tts import YandexSpeechKitTTSEntity
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+PLATFORMS = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.STT, Platform.TTS]
 
-PLATFORMS = [Platform.STT, Platform.TTS]
+# grpc and the generated SpeechKit modules take a while to import, so
+# they are only loaded in the executor once an entry is set up
+GRPC_MODULES = (".channels", ".stt", ".tts")
+
+
+@dataclass
+class YandexSpeechKitData:
+    """Runtime data of a Yandex SpeechKit config entry."""
+
+    channels: YandexSpeechKitChannels
+    cache: YandexSpeechKitCache | None
+    metrics: YandexSpeechKitMetrics
+    scheduler: YandexSpeechKitScheduler
+    tts_entity: YandexSpeechKitTTSEntity | None = None
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Yandex SpeechKit integration."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up a config entry."""
 
+    cache = None
+    if cache_size := entry.options.get(CONF_CACHE_SIZE, DEFAULT_CACHE_SIZE):
+        cache = YandexSpeechKitCache(
+            hass,
+            hass.config.path(".cache", DOMAIN, entry.entry_id),
+            cache_size * 1024 * 1024,
+            entry.options.get(CONF_CACHE_TTL, DEFAULT_CACHE_TTL) * 3600,
+        )
+        await cache.async_load()
+
+    credentials = await hass.async_add_executor_job(_load_grpc)
+    from .channels import YandexSpeechKitChannels
+
+    # Additional keys come from the options, duplicates are dropped
+    api_keys = list(
+        dict.fromkeys([entry.data[CONF_API_KEY], *entry.options.get(CONF_API_KEYS, [])])
+    )
+    channels = YandexSpeechKitChannels(
+        api_keys,
+        credentials,
+        tts_endpoints=entry.options.get(CONF_TTS_ENDPOINTS),
+        stt_endpoints=entry.options.get(CONF_STT_ENDPOINTS),
+        # Pings only pay off while the connections are kept warm
+        keepalive_interval=(
+            entry.options.get(CONF_KEEPALIVE_INTERVAL, DEFAULT_KEEPALIVE_INTERVAL)
+            if entry.options.get(CONF_WARM_UP, DEFAULT_WARM_UP)
+            else None
+        ),
+        idle_timeout=entry.options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+        breaker_threshold=entry.options.get(
+            CONF_BREAKER_THRESHOLD, DEFAULT_BREAKER_THRESHOLD
+        ),
+        breaker_probe_interval=entry.options.get(
+            CONF_BREAKER_PROBE_INTERVAL, DEFAULT_BREAKER_PROBE_INTERVAL
+        ),
+    )
+
+    metrics = YandexSpeechKitMetrics()
+    scheduler = YandexSpeechKitScheduler(
+        metrics,
+        entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+        entry.options.get(CONF_MAX_CONCURRENT_CALLS, DEFAULT_MAX_CONCURRENT_CALLS),
+    )
+    entry.runtime_data = YandexSpeechKitData(
+        channels=channels, cache=cache, metrics=metrics, scheduler=scheduler
+    )
+
+    if entry.options.get(CONF_WARM_UP, DEFAULT_WARM_UP):
+        entry.async_create_background_task(
+            hass, channels.async_keep_warm(), "yandex_speechkit_keep_warm"
+        )
+    entry.async_create_background_task(
+        hass,
+        channels.async_probe_latency(
+            entry.options.get(
+                CONF_ENDPOINT_PROBE_INTERVAL, DEFAULT_ENDPOINT_PROBE_INTERVAL
+            )
+        ),
+        "yandex_speechkit_probe_latency",
+    )
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     return True
 
 
+def _load_grpc() -> grpc.ChannelCredentials:
+    """Import the gRPC modules and load the TLS credentials."""
+    for module in GRPC_MODULES:
+        importlib.import_module(module, __package__)
+
+    import grpc
+
+    return grpc.ssl_channel_credentials()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        await entry.runtime_data.channels.async_close()
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the phrase cache of a removed config entry."""
+    await hass.async_add_executor_job(
+        shutil.rmtree, hass.config.path(".cache", DOMAIN, entry.entry_id), True
+    )
 
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -0,0 +1,451 @@
+"""Audio container helpers for Yandex SpeechKit."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+import zlib
+from collections.abc import AsyncGenerator, AsyncIterable
+from typing import BinaryIO
+
+WAV_UNKNOWN_SIZE = 0xFFFFFFFF
+WAV_MAX_HEADER_SIZE = 4096
+
+OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+OGG_CONTINUED = 0x01
+OGG_BOS = 0x02
+OGG_EOS = 0x04
+OPUS_HEADER_PACKETS = (b"OpusHead", b"OpusTags")
+OPUS_PRE_SKIP_OFFSET = 10
+
+BIT_REVERSED_BYTES = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+
+def ogg_crc(data: bytes | bytearray) -> int:
+    """Calculate the checksum of an Ogg page.
+
+    Ogg uses the unreflected form of CRC-32 without final inversion. zlib
+    computes the reflected form in C, so it is run on the data with the
+    bits of every byte reversed and the result is reversed back.
+    """
+    crc = zlib.crc32(data.translate(BIT_REVERSED_BYTES), 0xFFFFFFFF) ^ 0xFFFFFFFF
+    return int(f"{crc:032b}"[::-1], 2)
+
+
+def opus_packet_samples(packet: bytes | bytearray) -> int:
+    """Return the duration of an Opus packet in 48 kHz samples."""
+    if not packet:
+        return 0
+    config = packet[0] >> 3
+    if config < 12:
+        frame = (480, 960, 1920, 2880)[config & 3]
+    elif config < 16:
+        frame = (480, 960)[config & 1]
+    else:
+        frame = (120, 240, 480, 960)[config & 3]
+    code = packet[0] & 3
+    if code == 0:
+        return frame
+    if code < 3:
+        return 2 * frame
+    return frame * (packet[1] & 0x3F if len(packet) > 1 else 0)
+
+
+def build_ogg_page(
+    header_type: int, granule: int, serial: int, sequence: int, packets: list[bytes]
+) -> bytes:
+    """Build an Ogg page holding complete packets."""
+    lacing = bytearray()
+    for packet in packets:
+        lacing += b"\xff" * (len(packet) // 255) + bytes((len(packet) % 255,))
+    page = bytearray(
+        OGG_PAGE_HEADER.pack(
+            b"OggS", 0, header_type, granule, serial, sequence, 0, len(lacing)
+        )
+    )
+    page += lacing
+    for packet in packets:
+        page += packet
+    struct.pack_into("<I", page, 22, ogg_crc(page))
+    return bytes(page)
+
+
+def wav_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Return a PCM WAV header for a stream of unknown length."""
+    return (
+        b"RIFF"
+        + struct.pack("<I", WAV_UNKNOWN_SIZE)
+        + b"WAVEfmt "
+        + struct.pack(
+            "<IHHIIHH",
+            16,
+            1,
+            channels,
+            sample_rate,
+            sample_rate * channels * sample_width,
+            channels * sample_width,
+            sample_width * 8,
+        )
+        + b"data"
+        + struct.pack("<I", WAV_UNKNOWN_SIZE)
+    )
+
+
+def find_wav_data(data: bytes) -> int | None:
+    """Return the offset of the sample data in a WAV file.
+
+    Returns None if the header is not complete yet. Raises ValueError if
+    the data is not a RIFF/WAVE file.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        if chunk_id == b"data":
+            return offset + 8
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def find_id3_end(data: bytes) -> int | None:
+    """Return the length of a leading ID3v2 tag, 0 if there is none.
+
+    Returns None if more data is needed to tell.
+    """
+    if len(data) < 10:
+        return None if b"ID3".startswith(data[:3]) else 0
+    if data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+class AudioJoiner:
+    """Join consecutively synthesized segments into one audio stream.
+
+    Every segment returned by SpeechKit is a complete file. The joiner
+    works on chunks as they arrive:
+    - WAV headers of all but the first segment are dropped and the first
+      header is marked as having an unknown length;
+    - MP3 frames are concatenated, leading ID3 tags of follow-up segments
+      are dropped;
+    - Ogg Opus pages of follow-up segments lose their OpusHead/OpusTags
+      pages and are rewritten into the first logical stream with
+      continuous page numbers and granule positions.
+
+    Pages of the first segment are passed on unchanged. A decoder only
+    skips the encoder delay, the pre-skip, at the start of a stream, so
+    the leading packets of a follow-up segment holding its pre-skip are
+    dropped instead of being played at the seam. This cuts at most one
+    frame of the silence a synthesized segment starts with.
+    """
+
+    def __init__(self, container: str) -> None:
+        """Initialize the joiner."""
+        self._container = container
+        self._segment = -1
+        self._pending: bytes | None = b""
+
+        self._ogg_serial: int | None = None
+        self._ogg_sequence = 0
+        self._ogg_granule_offset = 0
+        self._ogg_segment_granule = 0
+        self._ogg_in_headers = False
+        self._ogg_skipping = False
+        self._ogg_pre_skip = 0
+        self._ogg_dropped = 0
+        self._ogg_held: tuple[bytearray, bytes] | None = None
+
+    def start_segment(self) -> None:
+        """Start a new segment."""
+        self._segment += 1
+        self._pending = b""
+        self._ogg_granule_offset += self._ogg_segment_granule - self._ogg_dropped
+        self._ogg_segment_granule = 0
+        self._ogg_in_headers = self._segment > 0
+        self._ogg_skipping = False
+        self._ogg_pre_skip = 0
+        self._ogg_dropped = 0
+
+    def feed(self, data: bytes) -> bytes:
+        """Process a chunk of the current segment and return bytes to emit."""
+        if self._container == "ogg":
+            return self._feed_ogg(data)
+        if self._pending is None:
+            return data
+
+        self._pending += data
+        if self._container == "wav":
+            return self._feed_wav()
+        if self._container == "mp3" and self._segment > 0:
+            return self._feed_mp3()
+
+        data, self._pending = self._pending, None
+        return data
+
+    def finish(self) -> bytes:
+        """Return the bytes still held back after the last segment."""
+        if self._ogg_held is None:
+            return b""
+        (page, original), self._ogg_held = self._ogg_held, None
+        page[5] |= OGG_EOS
+        return self._seal_ogg_page(page, original)
+
+    def _feed_wav(self) -> bytes:
+        """Drop or rewrite the header of a WAV segment."""
+        assert self._pending is not None
+        try:
+            data_offset = find_wav_data(self._pending)
+        except ValueError:
+            data, self._pending = self._pending, None
+            return data
+        if data_offset is None:
+            return b""
+
+        data, self._pending = self._pending, None
+        if self._segment > 0:
+            return data[data_offset:]
+
+        header = bytearray(data[:data_offset])
+        struct.pack_into("<I", header, 4, WAV_UNKNOWN_SIZE)
+        struct.pack_into("<I", header, data_offset - 4, WAV_UNKNOWN_SIZE)
+        return bytes(header) + data[data_offset:]
+
+    def _feed_mp3(self) -> bytes:
+        """Drop a leading ID3 tag of a follow-up MP3 segment."""
+        assert self._pending is not None
+        tag_end = find_id3_end(self._pending)
+        if tag_end is None or len(self._pending) < tag_end:
+            return b""
+        data, self._pending = self._pending, None
+        return data[tag_end:]
+
+    def _feed_ogg(self, data: bytes) -> bytes:
+        """Rewrite complete Ogg pages of the current segment."""
+        assert self._pending is not None
+        self._pending += data
+        output = []
+
+        while (page := self._next_ogg_page()) is not None:
+            if self._ogg_in_headers:
+                header_type = page[5]
+                body_start = OGG_PAGE_HEADER.size + page[26]
+                body = bytes(page[body_start : body_start + 8])
+                if (
+                    header_type & OGG_BOS
+                    or body in OPUS_HEADER_PACKETS
+                    or (self._ogg_skipping and header_type & OGG_CONTINUED)
+                ):
+                    if body == OPUS_HEADER_PACKETS[0]:
+                        (self._ogg_pre_skip,) = struct.unpack_from(
+                            "<H", page, body_start + OPUS_PRE_SKIP_OFFSET
+                        )
+                    self._ogg_skipping = True
+                    continue
+                self._ogg_in_headers = False
+
+            # The checksum covers the body too, so a trimmed page is resealed
+            original = b""
+            if self._ogg_pre_skip > 0:
+                if (page := self._trim_ogg_page(page)) is None:
+                    continue
+            else:
+                original = bytes(page[5:22])
+            _, _, header_type, granule, serial, *_ = OGG_PAGE_HEADER.unpack_from(page)
+            if self._ogg_serial is None:
+                self._ogg_serial = serial
+            if granule != -1:
+                self._ogg_segment_granule = max(self._ogg_segment_granule, granule)
+                granule += self._ogg_granule_offset - self._ogg_dropped
+
+            if self._ogg_sequence > 0:
+                header_type &= ~OGG_BOS
+            header_type &= ~OGG_EOS
+            struct.pack_into(
+                "<BqII",
+                page,
+                5,
+                header_type,
+                granule,
+                self._ogg_serial,
+                self._ogg_sequence,
+            )
+            self._ogg_sequence += 1
+
+            if self._ogg_held is not None:
+                output.append(self._seal_ogg_page(*self._ogg_held))
+            self._ogg_held = (page, original)
+
+        return b"".join(output)
+
+    def _trim_ogg_page(self, page: bytearray) -> bytearray | None:
+        """Drop the leading packets of a page that hold the pre-skip.
+
+        Returns None if no packet is left on the page.
+        """
+        segments = page[26]
+        lacing = page[OGG_PAGE_HEADER.size : OGG_PAGE_HEADER.size + segments]
+        if page[5] & OGG_CONTINUED:
+            # Starts with the rest of a packet, leave the seam as it is
+            self._ogg_pre_skip = 0
+            return page
+
+        offset = OGG_PAGE_HEADER.size + segments
+        index = size = 0
+        while index < segments and self._ogg_pre_skip > 0:
+            size += lacing[index]
+            index += 1
+            if lacing[index - 1] == 255:
+                # The packet goes on, possibly on the next page
+                continue
+            samples = opus_packet_samples(page[offset : offset + size])
+            self._ogg_pre_skip -= samples
+            self._ogg_dropped += samples
+            offset += size
+            lacing = lacing[index:]
+            segments -= index
+            index = size = 0
+
+        if not segments:
+            return None
+        trimmed = bytearray(page[: OGG_PAGE_HEADER.size])
+        trimmed[26] = segments
+        trimmed += lacing
+        trimmed += page[offset:]
+        return trimmed
+
+    def _next_ogg_page(self) -> bytearray | None:
+        """Cut the next complete page off the pending data."""
+        assert self._pending is not None
+        pending = self._pending
+        if len(pending) < OGG_PAGE_HEADER.size:
+            return None
+        if pending[:4] != b"OggS":
+            raise ValueError("Not an Ogg stream")
+        segments = pending[26]
+        header_size = OGG_PAGE_HEADER.size + segments
+        if len(pending) < header_size:
+            return None
+        page_size = header_size + sum(pending[OGG_PAGE_HEADER.size : header_size])
+        if len(pending) < page_size:
+            return None
+        self._pending = pending[page_size:]
+        return bytearray(pending[:page_size])
+
+    @staticmethod
+    def _seal_ogg_page(page: bytearray, original: bytes) -> bytes:
+        """Update the checksum of a page if its header was rewritten.
+
+        original holds the header fields from the flags to the page number
+        as they were when the page's checksum was computed, empty if the
+        checksum is stale anyway.
+        """
+        if page[5:22] != original:
+            struct.pack_into("<I", page, 22, 0)
+            struct.pack_into("<I", page, 22, ogg_crc(page))
+        return bytes(page)
+
+
+def join_segments(container: str, segments: list[bytes]) -> bytes:
+    """Join complete audio segments into one file."""
+    if len(segments) == 1 and container != "wav":
+        # Only WAV may need its sizes filled in
+        return segments[0]
+    joiner = AudioJoiner(container)
+    parts = []
+    for segment in segments:
+        joiner.start_segment()
+        parts.append(joiner.feed(segment))
+    parts.append(joiner.finish())
+    data = b"".join(parts)
+
+    if container == "wav":
+        try:
+            data_offset = find_wav_data(data)
+        except ValueError:
+            return data
+        if data_offset is not None:
+            header = bytearray(data[:data_offset])
+            struct.pack_into("<I", header, 4, len(data) - 8)
+            struct.pack_into("<I", header, data_offset - 4, len(data) - data_offset)
+            data = bytes(header) + data[data_offset:]
+
+    return data
+
+
+def patch_wav_file(file: BinaryIO) -> None:
+    """Fill in the sizes of a WAV file written with an unknown length."""
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    try:
+        data_offset = find_wav_data(file.read(WAV_MAX_HEADER_SIZE))
+    except ValueError:
+        return
+    if data_offset is None:
+        return
+    file.seek(4)
+    file.write(struct.pack("<I", size - 8))
+    file.seek(data_offset - 4)
+    file.write(struct.pack("<I", size - data_offset))
+
+
+async def coalesce_audio(
+    stream: AsyncIterable[bytes], target_size: int, max_delay: float
+) -> AsyncGenerator[bytes]:
+    """Batch small audio chunks into chunks of at least target_size bytes.
+
+    Buffered audio is flushed early if it has waited for max_delay
+    seconds, so batching never holds audio back for long when the
+    stream slows down or stalls.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for chunk in stream:
+                queue.put_nowait(chunk)
+        finally:
+            queue.put_nowait(None)
+
+    pump_task = asyncio.create_task(pump())
+    buffer = bytearray()
+    deadline: float | None = None
+    try:
+        while True:
+            timeout = None if deadline is None else max(0, deadline - loop.time())
+            try:
+                chunk = await asyncio.wait_for(queue.get(), timeout)
+            except TimeoutError:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+                continue
+
+            if chunk is None:
+                break
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer += chunk
+            if len(buffer) >= target_size:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+
+        if buffer:
+            yield bytes(buffer)
+        await pump_task
+    finally:
+        pump_task.cancel()
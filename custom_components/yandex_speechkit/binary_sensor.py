@@ -0,0 +1,104 @@
+"""Reachability of the Yandex SpeechKit endpoints."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .breaker import CircuitBreaker
+    from .channels import YandexSpeechKitChannels
+
+
+@dataclass(frozen=True, kw_only=True)
+class YandexSpeechKitBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a Yandex SpeechKit circuit breaker sensor."""
+
+    breaker_fn: Callable[[YandexSpeechKitChannels], CircuitBreaker]
+
+
+BINARY_SENSORS: tuple[YandexSpeechKitBinarySensorEntityDescription, ...] = (
+    YandexSpeechKitBinarySensorEntityDescription(
+        key="tts_reachable",
+        translation_key="tts_reachable",
+        breaker_fn=lambda channels: channels.tts_breaker,
+    ),
+    YandexSpeechKitBinarySensorEntityDescription(
+        key="stt_reachable",
+        translation_key="stt_reachable",
+        breaker_fn=lambda channels: channels.stt_breaker,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Yandex SpeechKit binary sensors."""
+    async_add_entities(
+        YandexSpeechKitBinarySensorEntity(config_entry, description)
+        for description in BINARY_SENSORS
+    )
+
+
+class YandexSpeechKitBinarySensorEntity(BinarySensorEntity):
+    """Whether calls to a SpeechKit endpoint are let through.
+
+    The sensor is off while the circuit breaker of the endpoint is open,
+    so automations can switch to a local engine right away.
+    """
+
+    entity_description: YandexSpeechKitBinarySensorEntityDescription
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        config_entry: ConfigEntry,
+        description: YandexSpeechKitBinarySensorEntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
+        )
+        self._breaker = description.breaker_fn(config_entry.runtime_data.channels)
+
+    async def async_added_to_hass(self) -> None:
+        """Refresh the state whenever the breaker changes state."""
+        self.async_on_remove(
+            self._breaker.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def is_on(self) -> bool:
+        """Return whether the endpoint is considered reachable."""
+        return self._breaker.available
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the breaker state and the consecutive failures."""
+        return self._breaker.as_dict()
@@ -0,0 +1,138 @@
+"""Circuit breakers failing SpeechKit calls fast while the API is unreachable."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+from typing import Any
+
+import grpc
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import LOGGER
+from .rpc import UNREACHABLE_STATUS_CODES, CircuitOpenError
+
+PROBE_TIMEOUT = 10
+
+
+class CircuitState(StrEnum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after consecutive failures to reach it.
+
+    Once threshold calls in a row fail, the breaker opens and calls fail
+    immediately instead of waiting for a timeout. A background probe then
+    checks the endpoint every probe_interval seconds; when it succeeds
+    the breaker lets calls through again, closing on the first success
+    and opening again on the first failure. A threshold of 0 disables the
+    breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int,
+        probe_interval: float,
+        probe: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Initialize the breaker.
+
+        probe raises if the endpoint cannot be reached.
+        """
+        self.name = name
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._threshold = threshold
+        self._probe_interval = probe_interval
+        self._probe = probe
+        self._probe_task: asyncio.Task[None] | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for state changes, return a function that removes the listener."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @property
+    def available(self) -> bool:
+        """Return whether calls are let through."""
+        return self.state is not CircuitState.OPEN
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if calls should not be made."""
+        if not self.available:
+            raise CircuitOpenError(f"{self.name} is unreachable, not calling it")
+
+    def record(self, err: grpc.RpcError | None) -> None:
+        """Record the outcome of a call, None if it succeeded."""
+        if not self._threshold or isinstance(err, CircuitOpenError):
+            return
+        code = getattr(err, "code", None)
+        if err is None or not callable(code) or code() not in UNREACHABLE_STATUS_CODES:
+            if self.failures or self.state is not CircuitState.CLOSED:
+                self.failures = 0
+                self._set_state(CircuitState.CLOSED)
+            return
+
+        self.failures += 1
+        if self.state is CircuitState.HALF_OPEN or self.failures >= self._threshold:
+            self._open()
+
+    def _open(self) -> None:
+        """Fail calls and start probing the endpoint."""
+        if self.state is not CircuitState.OPEN:
+            LOGGER.warning(
+                "%s failed %s times in a row, failing calls until it recovers",
+                self.name,
+                self.failures,
+            )
+            self._set_state(CircuitState.OPEN)
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._async_probe())
+
+    async def _async_probe(self) -> None:
+        """Probe the endpoint until it can be reached."""
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            try:
+                await asyncio.wait_for(self._probe(), PROBE_TIMEOUT)
+            except (TimeoutError, grpc.RpcError) as err:
+                LOGGER.debug("%s is still unreachable: %s", self.name, err)
+                continue
+            LOGGER.info("%s is reachable again, letting calls through", self.name)
+            self._set_state(CircuitState.HALF_OPEN)
+            return
+
+    def _set_state(self, state: CircuitState) -> None:
+        """Change the state and notify the listeners."""
+        if state is self.state:
+            return
+        self.state = state
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state for diagnostics."""
+        return {"state": self.state, "failures": self.failures}
+
+    def stop(self) -> None:
+        """Stop probing the endpoint."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
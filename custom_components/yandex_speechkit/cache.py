@@ -0,0 +1,203 @@
+"""Disk-backed phrase cache for Yandex SpeechKit."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from homeassistant.core import HomeAssistant
+
+from .const import LOGGER
+
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class CacheEntry:
+    """A cached audio file."""
+
+    filename: str
+    size: int
+    created: float
+
+
+class YandexSpeechKitCache:
+    """LRU cache of synthesized phrases stored on disk.
+
+    Files survive Home Assistant restarts and TTS cache clears. The index
+    is kept in memory in least recently used order; the access time of
+    a file is its LRU position and the modification time is its age.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, directory: str, max_size: int, ttl: float
+    ) -> None:
+        """Initialize the cache.
+
+        max_size is in bytes, ttl in seconds; a ttl of 0 keeps entries
+        until they are evicted.
+        """
+        self._hass = hass
+        self._directory = directory
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Return the total size of cached files in bytes."""
+        return self._size
+
+    @property
+    def entries(self) -> int:
+        """Return the number of cached files."""
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(message: str, voice: str, language: str, container: str) -> str:
+        """Return the cache key of a phrase."""
+        text = WHITESPACE.sub(" ", message).strip()
+        digest = hashlib.sha1(
+            "\0".join((text, voice, language)).encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"{digest}.{container}"
+
+    async def async_load(self) -> None:
+        """Index the files already in the cache directory."""
+        entries = await self._hass.async_add_executor_job(self._scan)
+        for key, entry in entries:
+            self._entries[key] = entry
+            self._size += entry.size
+        LOGGER.debug(
+            "Loaded %s cached phrases (%s bytes)", len(self._entries), self._size
+        )
+        await self._async_evict()
+
+    def _scan(self) -> list[tuple[str, CacheEntry]]:
+        """Scan the cache directory, oldest access first."""
+        os.makedirs(self._directory, exist_ok=True)
+        found = []
+        with os.scandir(self._directory) as it:
+            for dir_entry in it:
+                if not dir_entry.is_file():
+                    continue
+                if dir_entry.name.endswith(".tmp"):
+                    os.remove(dir_entry.path)
+                    continue
+                stat = dir_entry.stat()
+                found.append(
+                    (
+                        stat.st_atime,
+                        dir_entry.name,
+                        CacheEntry(dir_entry.path, stat.st_size, stat.st_mtime),
+                    )
+                )
+        found.sort()
+        return [(key, entry) for _, key, entry in found]
+
+    def has(self, key: str) -> bool:
+        """Return whether a fresh entry exists, without reading it."""
+        if (entry := self._entries.get(key)) is None:
+            return False
+        return not self._ttl or time.time() - entry.created <= self._ttl
+
+    async def async_get(self, key: str) -> bytes | None:
+        """Return cached audio, or None on a miss."""
+        if (entry := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+
+        if self._ttl and time.time() - entry.created > self._ttl:
+            self.misses += 1
+            await self._async_remove(key)
+            return None
+
+        try:
+            data = await self._hass.async_add_executor_job(self._read, entry.filename)
+        except OSError as err:
+            LOGGER.warning("Error reading cached phrase %s: %s", entry.filename, err)
+            self.misses += 1
+            self._forget(key)
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return data
+
+    @staticmethod
+    def _read(filename: str) -> bytes:
+        """Read a cached file and mark it as used."""
+        with open(filename, "rb") as file:
+            stat = os.fstat(file.fileno())
+            data = file.read()
+        os.utime(filename, (time.time(), stat.st_mtime))
+        return data
+
+    async def async_put(self, key: str, data: bytes) -> None:
+        """Store audio in the cache."""
+        if not data or len(data) > self._max_size:
+            return
+
+        filename = os.path.join(self._directory, key)
+        try:
+            await self._hass.async_add_executor_job(self._write, filename, data)
+        except OSError as err:
+            LOGGER.warning("Error caching phrase %s: %s", filename, err)
+            return
+
+        self._forget(key)
+        self._entries[key] = CacheEntry(filename, len(data), time.time())
+        self._size += len(data)
+        await self._async_evict()
+
+    @staticmethod
+    def _write(filename: str, data: bytes) -> None:
+        """Write a file atomically."""
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, "wb") as file:
+            file.write(data)
+        os.replace(tmp_filename, filename)
+
+    async def _async_evict(self) -> None:
+        """Remove least recently used files until the cache fits its limit."""
+        evicted = []
+        while self._size > self._max_size and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry.size
+            evicted.append(entry.filename)
+
+        if evicted:
+            LOGGER.debug("Evicting %s cached phrases", len(evicted))
+            await self._hass.async_add_executor_job(self._unlink, evicted)
+
+    async def _async_remove(self, key: str) -> None:
+        """Remove a single entry."""
+        if entry := self._forget(key):
+            await self._hass.async_add_executor_job(self._unlink, [entry.filename])
+
+    def _forget(self, key: str) -> CacheEntry | None:
+        """Drop an entry from the index."""
+        if entry := self._entries.pop(key, None):
+            self._size -= entry.size
+        return entry
+
+    @staticmethod
+    def _unlink(filenames: list[str]) -> None:
+        """Delete files, ignoring ones that are already gone."""
+        for filename in filenames:
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
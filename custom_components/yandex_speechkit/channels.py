@@ -0,0 +1,337 @@
+"""gRPC channels shared by the Yandex SpeechKit entities."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import grpc
+import yandex.cloud.ai.stt.v3.stt_service_pb2_grpc as stt_service_pb2_grpc
+import yandex.cloud.ai.tts.v3.tts_service_pb2_grpc as tts_service_pb2_grpc
+from grpc import aio
+
+from .breaker import CircuitBreaker
+from .const import (
+    DEFAULT_BREAKER_PROBE_INTERVAL,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_ENDPOINT_PROBE_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    LOGGER,
+    MIN_KEEPALIVE_INTERVAL,
+    STT_ENDPOINT,
+    TTS_ENDPOINT,
+)
+from .credentials import CredentialInterceptor, YandexSpeechKitCredentialPool
+from .rpc import UNREACHABLE_STATUS_CODES, CircuitOpenError
+
+WARM_UP_TIMEOUT = 10
+PROBE_TIMEOUT = 5
+PLAINTEXT_SCHEME = "http://"
+TLS_SCHEME = "https://"
+# Not implemented by SpeechKit, so any answer to it is a cheap round trip
+# that needs no API key and is not billed
+PROBE_METHOD = "/grpc.health.v1.Health/Check"
+# Weight of the latest probe in the smoothed round-trip time
+LATENCY_SMOOTHING = 0.3
+
+
+class Endpoint:
+    """A channel to one address of a SpeechKit service."""
+
+    def __init__(self, target: str, channel: aio.Channel, stub: Any) -> None:
+        """Initialize the endpoint."""
+        self.target = target
+        self.channel = channel
+        self.stub = stub
+        self.latency: float | None = None
+        self.healthy = True
+        self._probe_call = channel.unary_unary(
+            PROBE_METHOD,
+            request_serializer=lambda _: b"",
+            response_deserializer=lambda _: None,
+        )
+
+    async def async_probe(self) -> None:
+        """Measure the round-trip time to the endpoint."""
+        loop = asyncio.get_running_loop()
+        try:
+            # Connect first, so connection setup does not count as latency
+            await asyncio.wait_for(self.channel.channel_ready(), PROBE_TIMEOUT)
+            started = loop.time()
+            try:
+                await self._probe_call(None, timeout=PROBE_TIMEOUT)
+            except grpc.RpcError as err:
+                if err.code() in UNREACHABLE_STATUS_CODES:
+                    raise
+        except (TimeoutError, grpc.RpcError) as err:
+            if self.healthy:
+                LOGGER.debug("Endpoint %s is unreachable: %s", self.target, err)
+            self.healthy = False
+            return
+
+        rtt = loop.time() - started
+        if self.latency is None or not self.healthy:
+            self.latency = rtt
+        else:
+            self.latency += LATENCY_SMOOTHING * (rtt - self.latency)
+        self.healthy = True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the probe results for diagnostics."""
+        return {
+            "target": self.target,
+            "healthy": self.healthy,
+            "latency": None if self.latency is None else round(self.latency, 4),
+        }
+
+
+class EndpointGroup:
+    """Addresses of one SpeechKit service, used fastest first.
+
+    Requests go to the healthy endpoint with the lowest smoothed round-trip
+    time. Until endpoints have been probed, they are used in the order
+    they were configured. An endpoint a call could not reach is taken out
+    of use right away, until a probe finds it reachable again.
+    """
+
+    def __init__(self, name: str, endpoints: list[Endpoint]) -> None:
+        """Initialize the group."""
+        self.name = name
+        self.endpoints = endpoints
+        self._best = endpoints[0]
+
+    @property
+    def best(self) -> Endpoint:
+        """Return the endpoint requests should go to."""
+        return self._best
+
+    def record(self, endpoint: Endpoint, err: grpc.RpcError) -> None:
+        """Fail over to another endpoint if a call could not reach this one."""
+        if (
+            len(self.endpoints) < 2
+            or isinstance(err, CircuitOpenError)
+            or err.code() not in UNREACHABLE_STATUS_CODES
+            or not endpoint.healthy
+        ):
+            return
+        LOGGER.debug("%s call to %s failed: %s", self.name, endpoint.target, err)
+        endpoint.healthy = False
+        if endpoint is self._best and (
+            healthy := [other for other in self.endpoints if other.healthy]
+        ):
+            self._switch(healthy)
+
+    async def async_probe(self) -> None:
+        """Probe every endpoint and pick the fastest healthy one.
+
+        Raises UNAVAILABLE if none of them can be reached.
+        """
+        await asyncio.gather(*(endpoint.async_probe() for endpoint in self.endpoints))
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        if not healthy:
+            raise aio.AioRpcError(
+                grpc.StatusCode.UNAVAILABLE,
+                aio.Metadata(),
+                aio.Metadata(),
+                f"No {self.name} endpoint is reachable",
+            )
+        self._switch(healthy)
+
+    def _switch(self, healthy: list[Endpoint]) -> None:
+        """Send requests to the fastest of the healthy endpoints."""
+        best = min(
+            healthy,
+            key=lambda endpoint: (
+                endpoint.latency is None,
+                endpoint.latency or 0,
+            ),
+        )
+        if best is not self._best:
+            LOGGER.debug(
+                "Switching %s requests to %s (%.1f ms)",
+                self.name,
+                best.target,
+                (best.latency or 0) * 1000,
+            )
+            self._best = best
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the probe results for diagnostics."""
+        return [endpoint.as_dict() for endpoint in self.endpoints]
+
+    async def async_close(self) -> None:
+        """Close the channels of all endpoints."""
+        for endpoint in self.endpoints:
+            await endpoint.channel.close()
+
+
+class YandexSpeechKitChannels:
+    """Long-lived channels and stubs for the SpeechKit API.
+
+    One instance is created per config entry and shared by all of its
+    entities, so TCP, TLS and HTTP/2 setup is paid once instead of on
+    every request.
+    """
+
+    def __init__(
+        self,
+        api_keys: list[str],
+        credentials: grpc.ChannelCredentials | None,
+        tts_endpoints: list[str] | None = None,
+        stt_endpoints: list[str] | None = None,
+        keepalive_interval: int | None = None,
+        idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+        breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        breaker_probe_interval: float = DEFAULT_BREAKER_PROBE_INTERVAL,
+    ) -> None:
+        """Initialize the channels.
+
+        Keepalive pings are only sent with a keepalive interval, in
+        seconds and at least MIN_KEEPALIVE_INTERVAL. Calls are authorized
+        with the API keys in turn. Endpoints prefixed
+        with http:// are plaintext, which is only useful against a local
+        stand-in server; passing no credentials makes all of them
+        plaintext.
+        """
+        self.credentials = YandexSpeechKitCredentialPool(api_keys)
+        interceptors = [CredentialInterceptor(self.credentials)]
+        options = [("grpc.client_idle_timeout_ms", idle_timeout * 1000)]
+        if keepalive_interval:
+            interval = max(keepalive_interval, MIN_KEEPALIVE_INTERVAL)
+            options += [
+                ("grpc.keepalive_time_ms", interval * 1000),
+                ("grpc.keepalive_timeout_ms", 10000),
+                ("grpc.keepalive_permit_without_calls", 1),
+            ]
+
+        def create_group(
+            name: str, targets: list[str], stub_factory: Callable[[aio.Channel], Any]
+        ) -> EndpointGroup:
+            endpoints = []
+            for target in targets:
+                channel = self._create_channel(
+                    target, credentials, options, interceptors
+                )
+                endpoints.append(Endpoint(target, channel, stub_factory(channel)))
+            return EndpointGroup(name, endpoints)
+
+        self.tts = create_group(
+            "TTS",
+            tts_endpoints or [TTS_ENDPOINT],
+            tts_service_pb2_grpc.SynthesizerStub,
+        )
+        self.stt = create_group(
+            "STT",
+            stt_endpoints or [STT_ENDPOINT],
+            stt_service_pb2_grpc.RecognizerStub,
+        )
+
+        self.tts_breaker = CircuitBreaker(
+            "SpeechKit TTS",
+            breaker_threshold,
+            breaker_probe_interval,
+            self.tts.async_probe,
+        )
+        self.stt_breaker = CircuitBreaker(
+            "SpeechKit STT",
+            breaker_threshold,
+            breaker_probe_interval,
+            self.stt.async_probe,
+        )
+
+    @staticmethod
+    def _create_channel(
+        target: str,
+        credentials: grpc.ChannelCredentials | None,
+        options: list[tuple[str, int]],
+        interceptors: list[aio.ClientInterceptor],
+    ) -> aio.Channel:
+        """Open a channel to the target."""
+        if target.startswith(PLAINTEXT_SCHEME) or credentials is None:
+            return aio.insecure_channel(
+                target.removeprefix(PLAINTEXT_SCHEME),
+                options=options,
+                interceptors=interceptors,
+            )
+        return aio.secure_channel(
+            target.removeprefix(TLS_SCHEME),
+            credentials,
+            options=options,
+            interceptors=interceptors,
+        )
+
+    async def async_probe_latency(
+        self, interval: float = DEFAULT_ENDPOINT_PROBE_INTERVAL
+    ) -> None:
+        """Probe the endpoints of both services every interval seconds.
+
+        Runs until cancelled or the channels are closed. Services with a
+        single endpoint are not probed, as there is nothing to choose from.
+        """
+        # A lone endpoint is never taken out of use either: while it is
+        # unreachable, the circuit breaker fails calls fast and probes it
+        groups = [group for group in (self.tts, self.stt) if len(group.endpoints) > 1]
+        if not groups:
+            return
+        while True:
+            for group in groups:
+                try:
+                    await group.async_probe()
+                except grpc.RpcError as err:
+                    LOGGER.debug("%s", err.details())
+                except aio.UsageError:
+                    # Closed on unload in the middle of a probe
+                    return
+            await asyncio.sleep(interval)
+
+    async def async_keep_warm(self) -> None:
+        """Connect all channels and reconnect them whenever they go idle.
+
+        Runs until the channels are closed, so the first request after
+        startup or a quiet period finds a READY connection.
+        """
+        await asyncio.gather(
+            *(
+                self._async_keep_channel_warm(endpoint.channel, endpoint.target)
+                for group in (self.tts, self.stt)
+                for endpoint in group.endpoints
+            )
+        )
+
+    @staticmethod
+    async def _async_keep_channel_warm(channel: aio.Channel, name: str) -> None:
+        """Keep a single channel connected."""
+        try:
+            try:
+                await asyncio.wait_for(channel.channel_ready(), WARM_UP_TIMEOUT)
+            except TimeoutError:
+                LOGGER.warning("Timed out warming up the %s channel", name)
+            else:
+                LOGGER.debug("%s channel is ready", name)
+
+            state = channel.get_state()
+            while state is not grpc.ChannelConnectivity.SHUTDOWN:
+                if state in (
+                    grpc.ChannelConnectivity.IDLE,
+                    grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+                ):
+                    LOGGER.debug("Reconnecting the %s channel from %s", name, state)
+                    channel.get_state(try_to_connect=True)
+                await channel.wait_for_state_change(state)
+                state = channel.get_state()
+        except aio.UsageError:
+            # Closed on unload while still connecting
+            LOGGER.debug("%s channel closed while warming up", name)
+
+    async def async_close(self) -> None:
+        """Close the channels, cancelling any active calls."""
+        LOGGER.debug("Closing SpeechKit channels")
+        self.tts_breaker.stop()
+        self.stt_breaker.stop()
+        await self.tts.async_close()
+        await self.stt.async_close()
@@ -23,9 +23,78 @@ from homeassistant.helpers.selector import (
     SelectSelector,
     SelectSelectorConfig,
     SelectSelectorMode,
+    TextSelector,
+    TextSelectorConfig,
+    TextSelectorType,
 )
 
-from .const import CONF_PROXY_MEDIA_TYPE, CONF_PROXY_SPEAKER, CONF_TTS_UNSAFE, DOMAIN
+from .const import (
+    CONF_API_KEYS,
+    CONF_BREAKER_PROBE_INTERVAL,
+    CONF_BREAKER_THRESHOLD,
+    CONF_CACHE_SIZE,
+    CONF_CACHE_TTL,
+    CONF_ENDPOINT_PROBE_INTERVAL,
+    CONF_IDLE_TIMEOUT,
+    CONF_KEEPALIVE_INTERVAL,
+    CONF_MAX_CONCURRENT_CALLS,
+    CONF_PROXY_FIRE_AND_FORGET,
+    CONF_PROXY_MEDIA_TYPE,
+    CONF_PROXY_MERGE_WINDOW,
+    CONF_PROXY_QUEUE_SIZE,
+    CONF_PROXY_SPEAKER,
+    CONF_RATE_LIMIT,
+    CONF_RETRIES,
+    CONF_STT_CHUNK_DURATION,
+    CONF_STT_ENDPOINTS,
+    CONF_STT_INTERIM_RESULTS,
+    CONF_STT_OPUS,
+    CONF_STT_TIMEOUT,
+    CONF_STT_TRAILING_SILENCE,
+    CONF_STT_TRIM_SILENCE,
+    CONF_TTS_CONCURRENCY,
+    CONF_TTS_ENDPOINTS,
+    CONF_TTS_FIRST_CHUNK_TIMEOUT,
+    CONF_TTS_HEDGING,
+    CONF_TTS_LONG_TEXT,
+    CONF_TTS_NORMALIZE,
+    CONF_TTS_REWRITE_RULES,
+    CONF_TTS_ROUND_NUMBERS,
+    CONF_TTS_TIMEOUT,
+    CONF_TTS_UNSAFE,
+    CONF_WARM_UP,
+    DEFAULT_BREAKER_PROBE_INTERVAL,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_ENDPOINT_PROBE_INTERVAL,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_KEEPALIVE_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_CALLS,
+    DEFAULT_PROXY_FIRE_AND_FORGET,
+    DEFAULT_PROXY_MERGE_WINDOW,
+    DEFAULT_PROXY_QUEUE_SIZE,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RETRIES,
+    DEFAULT_STT_CHUNK_DURATION,
+    DEFAULT_STT_INTERIM_RESULTS,
+    DEFAULT_STT_OPUS,
+    DEFAULT_STT_TIMEOUT,
+    DEFAULT_STT_TRAILING_SILENCE,
+    DEFAULT_STT_TRIM_SILENCE,
+    DEFAULT_TTS_CONCURRENCY,
+    DEFAULT_TTS_FIRST_CHUNK_TIMEOUT,
+    DEFAULT_TTS_HEDGING,
+    DEFAULT_TTS_LONG_TEXT,
+    DEFAULT_TTS_NORMALIZE,
+    DEFAULT_TTS_TIMEOUT,
+    DEFAULT_WARM_UP,
+    DOMAIN,
+    MIN_KEEPALIVE_INTERVAL,
+    STT_ENDPOINT,
+    TTS_ENDPOINT,
+)
+from .normalize import parse_rewrite_rules
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
@@ -84,6 +153,101 @@ class YandexSpeechKitOptionsFlow(OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Handle TTS options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                parse_rewrite_rules(user_input.get(CONF_TTS_REWRITE_RULES, ""))
+            except ValueError:
+                errors[CONF_TTS_REWRITE_RULES] = "invalid_rewrite_rule"
+            else:
+                self._user_input.update(user_input)
+                return await self.async_step_stt()
+
+        schema = self.add_suggested_values_to_schema(
+            vol.Schema(
+                {
+                    vol.Optional(CONF_TTS_UNSAFE, default=False): bool,
+                    vol.Optional(
+                        CONF_TTS_CONCURRENCY, default=DEFAULT_TTS_CONCURRENCY
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Optional(CONF_CACHE_SIZE, default=DEFAULT_CACHE_SIZE): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=10240)
+                    ),
+                    vol.Optional(CONF_CACHE_TTL, default=DEFAULT_CACHE_TTL): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=8760)
+                    ),
+                    vol.Optional(
+                        CONF_TTS_FIRST_CHUNK_TIMEOUT,
+                        default=DEFAULT_TTS_FIRST_CHUNK_TIMEOUT,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                    vol.Optional(
+                        CONF_TTS_TIMEOUT, default=DEFAULT_TTS_TIMEOUT
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                    vol.Optional(CONF_TTS_HEDGING, default=DEFAULT_TTS_HEDGING): bool,
+                    vol.Optional(
+                        CONF_TTS_LONG_TEXT, default=DEFAULT_TTS_LONG_TEXT
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100000)),
+                    vol.Optional(
+                        CONF_TTS_NORMALIZE, default=DEFAULT_TTS_NORMALIZE
+                    ): bool,
+                    vol.Optional(CONF_TTS_ROUND_NUMBERS): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=6)
+                    ),
+                    vol.Optional(CONF_TTS_REWRITE_RULES): TextSelector(
+                        TextSelectorConfig(multiline=True)
+                    ),
+                }
+            ),
+            user_input or self._config_entry.options,
+        )
+
+        return self.async_show_form(
+            step_id="tts",
+            data_schema=schema,
+            errors=errors,
+        )
+
+    async def async_step_stt(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Handle STT options."""
+        if user_input is not None:
+            self._user_input.update(user_input)
+            return await self.async_step_connection()
+
+        schema = self.add_suggested_values_to_schema(
+            vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_STT_CHUNK_DURATION, default=DEFAULT_STT_CHUNK_DURATION
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=500)),
+                    vol.Optional(
+                        CONF_STT_TRIM_SILENCE, default=DEFAULT_STT_TRIM_SILENCE
+                    ): bool,
+                    vol.Optional(
+                        CONF_STT_TRAILING_SILENCE, default=DEFAULT_STT_TRAILING_SILENCE
+                    ): vol.All(vol.Coerce(int), vol.Range(min=100, max=5000)),
+                    vol.Optional(CONF_STT_OPUS, default=DEFAULT_STT_OPUS): bool,
+                    vol.Optional(
+                        CONF_STT_TIMEOUT, default=DEFAULT_STT_TIMEOUT
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+                    vol.Optional(
+                        CONF_STT_INTERIM_RESULTS, default=DEFAULT_STT_INTERIM_RESULTS
+                    ): bool,
+                }
+            ),
+            self._config_entry.options,
+        )
+
+        return self.async_show_form(
+            step_id="stt",
+            data_schema=schema,
+        )
+
+    async def async_step_connection(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Handle connection options."""
         if user_input is not None:
             self._user_input.update(user_input)
             return await self.async_step_proxy()
@@ -91,14 +255,54 @@ class YandexSpeechKitOptionsFlow(OptionsFlow):
         schema = self.add_suggested_values_to_schema(
             vol.Schema(
                 {
-                    vol.Optional(CONF_TTS_UNSAFE, default=False): bool,
+                    vol.Optional(CONF_API_KEYS): TextSelector(
+                        TextSelectorConfig(
+                            type=TextSelectorType.PASSWORD, multiple=True
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_TTS_ENDPOINTS, default=[TTS_ENDPOINT]
+                    ): TextSelector(TextSelectorConfig(multiple=True)),
+                    vol.Optional(
+                        CONF_STT_ENDPOINTS, default=[STT_ENDPOINT]
+                    ): TextSelector(TextSelectorConfig(multiple=True)),
+                    vol.Optional(
+                        CONF_ENDPOINT_PROBE_INTERVAL,
+                        default=DEFAULT_ENDPOINT_PROBE_INTERVAL,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Optional(CONF_WARM_UP, default=DEFAULT_WARM_UP): bool,
+                    vol.Optional(
+                        CONF_KEEPALIVE_INTERVAL, default=DEFAULT_KEEPALIVE_INTERVAL
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_KEEPALIVE_INTERVAL, max=3600),
+                    ),
+                    vol.Optional(
+                        CONF_IDLE_TIMEOUT, default=DEFAULT_IDLE_TIMEOUT
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                    vol.Optional(CONF_RETRIES, default=DEFAULT_RETRIES): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=5)
+                    ),
+                    vol.Optional(CONF_RATE_LIMIT, default=DEFAULT_RATE_LIMIT): vol.All(
+                        vol.Coerce(float), vol.Range(min=0, max=1000)
+                    ),
+                    vol.Optional(
+                        CONF_MAX_CONCURRENT_CALLS, default=DEFAULT_MAX_CONCURRENT_CALLS
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Optional(
+                        CONF_BREAKER_THRESHOLD, default=DEFAULT_BREAKER_THRESHOLD
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                    vol.Optional(
+                        CONF_BREAKER_PROBE_INTERVAL,
+                        default=DEFAULT_BREAKER_PROBE_INTERVAL,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
                 }
             ),
             self._config_entry.options,
         )
 
         return self.async_show_form(
-            step_id="tts",
+            step_id="connection",
             data_schema=schema,
         )
 
@@ -122,6 +326,16 @@ class YandexSpeechKitOptionsFlow(OptionsFlow):
                             options=["tts", "text", "dialog"],
                         )
                     ),
+                    vol.Optional(
+                        CONF_PROXY_FIRE_AND_FORGET,
+                        default=DEFAULT_PROXY_FIRE_AND_FORGET,
+                    ): bool,
+                    vol.Optional(
+                        CONF_PROXY_MERGE_WINDOW, default=DEFAULT_PROXY_MERGE_WINDOW
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                    vol.Optional(
+                        CONF_PROXY_QUEUE_SIZE, default=DEFAULT_PROXY_QUEUE_SIZE
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
                 }
             ),
             self._config_entry.options,
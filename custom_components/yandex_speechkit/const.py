@@ -6,11 +6,12 @@
 
 import logging
 
-from yandex.cloud.ai.tts.v3.tts_pb2 import ContainerAudio
-
 DOMAIN = "yandex_speechkit"
 LOGGER = logging.getLogger(__package__)
 
+TTS_ENDPOINT = "tts.api.cloud.yandex.net:443"
+STT_ENDPOINT = "stt.api.cloud.yandex.net:443"
+
 
 # https://yandex.cloud/ru/docs/speechkit/stt/models
 STT_LANGUAGES = [
@@ -62,20 +63,92 @@ TTS_VOICES = {
 
 TTS_LANGUAGES = list(TTS_VOICES.keys())
 
+# Names of ContainerAudio.ContainerAudioType values, resolved when the
+# generated modules have been loaded
 TTS_OUTPUT_CONTAINERS = {
-    "wav": ContainerAudio.WAV,
-    "mp3": ContainerAudio.MP3,
-    "ogg": ContainerAudio.OGG_OPUS,
+    "wav": "WAV",
+    "mp3": "MP3",
+    "ogg": "OGG_OPUS",
 }
+# Raw LINEAR16_PCM, returned wrapped in a WAV header
+TTS_OUTPUT_PCM = "pcm"
+TTS_OUTPUT_FORMATS = [*TTS_OUTPUT_CONTAINERS, TTS_OUTPUT_PCM]
+TTS_PCM_SAMPLE_RATES = (8000, 16000, 22050, 48000)
+
+ATTR_SAMPLE_RATE = "sample_rate"
+ATTR_PRIORITY = "priority"
+
+EVENT_STT_INTERIM_RESULT = f"{DOMAIN}_stt_interim_result"
 
 PROXY_ERROR = "error"
 PROXY_EMPTY_WAV = "empty_wav"
 PROXY_EMPTY_MP3 = "empty_mp3"
 
 CONF_TTS_UNSAFE = "tts_unsafe"
+CONF_TTS_CONCURRENCY = "tts_concurrency"
+CONF_STT_CHUNK_DURATION = "stt_chunk_duration"
+CONF_STT_TRIM_SILENCE = "stt_trim_silence"
+CONF_STT_TRAILING_SILENCE = "stt_trailing_silence"
+CONF_STT_OPUS = "stt_opus"
+CONF_STT_TIMEOUT = "stt_timeout"
+CONF_STT_INTERIM_RESULTS = "stt_interim_results"
+CONF_TTS_FIRST_CHUNK_TIMEOUT = "tts_first_chunk_timeout"
+CONF_TTS_TIMEOUT = "tts_timeout"
+CONF_TTS_HEDGING = "tts_hedging"
+CONF_TTS_LONG_TEXT = "tts_long_text"
+CONF_TTS_NORMALIZE = "tts_normalize"
+CONF_TTS_ROUND_NUMBERS = "tts_round_numbers"
+CONF_TTS_REWRITE_RULES = "tts_rewrite_rules"
+CONF_RETRIES = "retries"
+CONF_CACHE_SIZE = "cache_size"
+CONF_CACHE_TTL = "cache_ttl"
 CONF_PROXY_SPEAKER = "proxy_speaker"
 CONF_PROXY_MEDIA_TYPE = "proxy_media_type"
+CONF_PROXY_FIRE_AND_FORGET = "proxy_fire_and_forget"
+CONF_PROXY_MERGE_WINDOW = "proxy_merge_window"
+CONF_PROXY_QUEUE_SIZE = "proxy_queue_size"
+CONF_WARM_UP = "warm_up"
+CONF_KEEPALIVE_INTERVAL = "keepalive_interval"
+CONF_IDLE_TIMEOUT = "idle_timeout"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_API_KEYS = "api_keys"
+CONF_BREAKER_THRESHOLD = "breaker_threshold"
+CONF_BREAKER_PROBE_INTERVAL = "breaker_probe_interval"
+CONF_TTS_ENDPOINTS = "tts_endpoints"
+CONF_STT_ENDPOINTS = "stt_endpoints"
+CONF_ENDPOINT_PROBE_INTERVAL = "endpoint_probe_interval"
+CONF_MAX_CONCURRENT_CALLS = "max_concurrent_calls"
+
+# gRPC servers answer more frequent pings with GOAWAY "too_many_pings"
+MIN_KEEPALIVE_INTERVAL = 60
 
 DEFAULT_LANG = "ru-RU"
 DEFAULT_VOICE = "marina"
 DEFAULT_OUTPUT_CONTAINER = "mp3"
+DEFAULT_PCM_SAMPLE_RATE = 16000
+DEFAULT_TTS_CONCURRENCY = 4
+DEFAULT_STT_CHUNK_DURATION = 80
+DEFAULT_STT_TRIM_SILENCE = False
+DEFAULT_STT_TRAILING_SILENCE = 800
+DEFAULT_STT_OPUS = False
+DEFAULT_STT_TIMEOUT = 60
+DEFAULT_STT_INTERIM_RESULTS = False
+DEFAULT_TTS_FIRST_CHUNK_TIMEOUT = 5
+DEFAULT_TTS_TIMEOUT = 30
+DEFAULT_TTS_HEDGING = False
+DEFAULT_TTS_LONG_TEXT = 3000
+DEFAULT_TTS_NORMALIZE = False
+DEFAULT_RETRIES = 2
+DEFAULT_CACHE_SIZE = 50
+DEFAULT_CACHE_TTL = 0
+DEFAULT_WARM_UP = False
+DEFAULT_KEEPALIVE_INTERVAL = 300
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_RATE_LIMIT = 20
+DEFAULT_MAX_CONCURRENT_CALLS = 10
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_PROBE_INTERVAL = 10
+DEFAULT_ENDPOINT_PROBE_INTERVAL = 60
+DEFAULT_PROXY_FIRE_AND_FORGET = False
+DEFAULT_PROXY_MERGE_WINDOW = 0
+DEFAULT_PROXY_QUEUE_SIZE = 10
@@ -0,0 +1,157 @@
+"""Pool of API keys shared by the SpeechKit calls of a config entry."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import AsyncIterable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import grpc
+from grpc import aio
+
+from .const import LOGGER
+
+# How long a key stays out of rotation after a failure
+COOLDOWNS = {
+    grpc.StatusCode.UNAUTHENTICATED: 300.0,
+    grpc.StatusCode.RESOURCE_EXHAUSTED: 10.0,
+}
+
+
+@dataclass
+class Credential:
+    """An API key and its usage."""
+
+    label: str
+    metadata: tuple[tuple[str, str], ...]
+    outstanding: int = 0
+    calls: int = 0
+    status_codes: Counter[str] = field(default_factory=Counter)
+    disabled_until: float = 0.0
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the usage of the key."""
+        return {
+            "label": self.label,
+            "outstanding": self.outstanding,
+            "calls": self.calls,
+            "status_codes": dict(self.status_codes),
+            "cooldown": max(0.0, round(self.disabled_until - now, 1)),
+        }
+
+
+class YandexSpeechKitCredentialPool:
+    """Spread calls over several API keys.
+
+    Every call is authorized with the available key that has the fewest
+    calls in progress. A key whose call fails with UNAUTHENTICATED or
+    RESOURCE_EXHAUSTED is taken out of rotation for a while; if all keys
+    are out, the one coming back first is used anyway.
+    """
+
+    def __init__(self, api_keys: list[str]) -> None:
+        """Initialize the pool."""
+        self._credentials = [
+            Credential(f"key_{index}", (("authorization", f"Api-Key {api_key}"),))
+            for index, api_key in enumerate(api_keys, 1)
+        ]
+
+    def acquire(self) -> Credential:
+        """Pick a key for a new call."""
+        now = time.monotonic()
+        available = [c for c in self._credentials if c.disabled_until <= now]
+        if available:
+            credential = min(available, key=lambda c: (c.outstanding, c.calls))
+        else:
+            credential = min(self._credentials, key=lambda c: c.disabled_until)
+        credential.outstanding += 1
+        credential.calls += 1
+        return credential
+
+    def release(self, credential: Credential, code: grpc.StatusCode) -> None:
+        """Account for a finished call."""
+        credential.outstanding -= 1
+        credential.status_codes[code.name] += 1
+        if (cooldown := COOLDOWNS.get(code)) is None:
+            return
+        if len(self._credentials) > 1:
+            LOGGER.warning(
+                "API %s failed with %s, taking it out of rotation for %s s",
+                credential.label.replace("_", " "),
+                code.name,
+                cooldown,
+            )
+        credential.disabled_until = time.monotonic() + cooldown
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the usage of every key."""
+        now = time.monotonic()
+        return [credential.as_dict(now) for credential in self._credentials]
+
+
+class CredentialInterceptor(
+    aio.UnaryStreamClientInterceptor, aio.StreamStreamClientInterceptor
+):
+    """Authorize every call with a key from the pool."""
+
+    def __init__(self, pool: YandexSpeechKitCredentialPool) -> None:
+        """Initialize the interceptor."""
+        self._pool = pool
+        self._watchers: set[asyncio.Task[None]] = set()
+
+    async def intercept_unary_stream(
+        self,
+        continuation: Callable[[aio.ClientCallDetails, Any], Any],
+        client_call_details: aio.ClientCallDetails,
+        request: Any,
+    ) -> aio.UnaryStreamCall:
+        """Start a server streaming call."""
+        return await self._intercept(continuation, client_call_details, request)
+
+    async def intercept_stream_stream(
+        self,
+        continuation: Callable[[aio.ClientCallDetails, Any], Any],
+        client_call_details: aio.ClientCallDetails,
+        request_iterator: AsyncIterable[Any],
+    ) -> aio.StreamStreamCall:
+        """Start a bidirectional streaming call."""
+        return await self._intercept(
+            continuation, client_call_details, request_iterator
+        )
+
+    async def _intercept(
+        self,
+        continuation: Callable[[aio.ClientCallDetails, Any], Any],
+        client_call_details: aio.ClientCallDetails,
+        request: Any,
+    ) -> Any:
+        """Start a call with a key from the pool and watch its outcome."""
+        credential = self._pool.acquire()
+        metadata = aio.Metadata(*credential.metadata)
+        try:
+            call = await continuation(
+                client_call_details._replace(metadata=metadata), request
+            )
+        except BaseException:
+            self._pool.release(credential, grpc.StatusCode.UNKNOWN)
+            raise
+
+        watcher = asyncio.create_task(self._watch(credential, call))
+        self._watchers.add(watcher)
+        watcher.add_done_callback(self._watchers.discard)
+        return call
+
+    async def _watch(self, credential: Credential, call: aio.Call) -> None:
+        """Release the key once the call has finished."""
+        code = grpc.StatusCode.CANCELLED
+        try:
+            code = await call.code()
+        finally:
+            self._pool.release(credential, code)
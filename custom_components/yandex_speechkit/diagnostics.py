@@ -0,0 +1,53 @@
+"""Diagnostics support for Yandex SpeechKit."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEYS
+
+TO_REDACT = {CONF_API_KEY, CONF_API_KEYS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data = entry.runtime_data
+    cache = runtime_data.cache
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "metrics": runtime_data.metrics.as_dict(),
+        "api_keys": runtime_data.channels.credentials.as_dict(),
+        "endpoints": {
+            "tts": runtime_data.channels.tts.as_dict(),
+            "stt": runtime_data.channels.stt.as_dict(),
+        },
+        "circuit_breakers": {
+            "tts": runtime_data.channels.tts_breaker.as_dict(),
+            "stt": runtime_data.channels.stt_breaker.as_dict(),
+        },
+        "cache": (
+            None
+            if cache is None
+            else {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "entries": cache.entries,
+                "size": cache.size,
+            }
+        ),
+    }
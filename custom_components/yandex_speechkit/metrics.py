@@ -0,0 +1,207 @@
+"""Latency and throughput metrics of Yandex SpeechKit calls."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import math
+from collections import Counter, deque
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+METRICS_WINDOW = 200
+
+METRIC_TTS = "tts"
+METRIC_STT = "stt"
+METRIC_QUEUE_WAIT = "queue_wait"
+METRIC_QUEUE_DEPTH = "queue_depth"
+METRIC_TEXT = "text"
+METRIC_GROUPS = (
+    METRIC_TTS,
+    METRIC_STT,
+    METRIC_QUEUE_WAIT,
+    METRIC_QUEUE_DEPTH,
+    METRIC_TEXT,
+)
+
+
+def rpc_status(err: Exception) -> str:
+    """Return the name of the status code of a failed gRPC call."""
+    code = getattr(err, "code", None)
+    return code().name if callable(code) else "UNKNOWN"
+
+
+class RollingHistogram:
+    """Keep the latest samples of a measurement and report percentiles."""
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Record a sample."""
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the recent samples, None if there are none."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        rank = math.ceil(percent / 100 * len(samples))
+        return samples[max(rank, 1) - 1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the sample count and the main percentiles."""
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class YandexSpeechKitMetrics:
+    """Timings and counters of the TTS and STT hot paths.
+
+    Durations are kept in seconds. Listeners subscribe to one of the
+    metric groups in METRIC_GROUPS and are called whenever it changes, so
+    sensors can refresh their state.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.tts_first_chunk = RollingHistogram()
+        self.tts_total = RollingHistogram()
+        self.tts_bytes = 0
+        self.tts_chunks = 0
+        self.tts_status_codes: Counter[str] = Counter()
+
+        self.stt_first_partial = RollingHistogram()
+        self.stt_final = RollingHistogram()
+        self.stt_audio_seconds = 0.0
+        self.stt_status_codes: Counter[str] = Counter()
+
+        self.queue_wait = RollingHistogram()
+        self.queue_depth = 0
+
+        self.text_normalized = 0
+        self.text_changed = 0
+        self.text_cache_hits = 0
+
+        self._listeners: dict[str, list[CALLBACK_TYPE]] = {
+            group: [] for group in METRIC_GROUPS
+        }
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, group: str
+    ) -> CALLBACK_TYPE:
+        """Listen for updates of a metric group.
+
+        Returns a function that removes the listener.
+        """
+        self._listeners[group].append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners[group].remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_record_tts(
+        self,
+        status: str,
+        first_chunk: float | None,
+        total: float,
+        size: int,
+        chunks: int,
+    ) -> None:
+        """Record a synthesis call."""
+        self.tts_status_codes[status] += 1
+        if first_chunk is not None:
+            self.tts_first_chunk.add(first_chunk)
+        self.tts_total.add(total)
+        self.tts_bytes += size
+        self.tts_chunks += chunks
+        self._async_notify(METRIC_TTS)
+
+    @callback
+    def async_record_stt(
+        self,
+        status: str,
+        first_partial: float | None,
+        final: float | None,
+        audio_seconds: float,
+    ) -> None:
+        """Record a recognition call."""
+        self.stt_status_codes[status] += 1
+        if first_partial is not None:
+            self.stt_first_partial.add(first_partial)
+        if final is not None:
+            self.stt_final.add(final)
+        self.stt_audio_seconds += audio_seconds
+        self._async_notify(METRIC_STT)
+
+    @callback
+    def async_record_queue_wait(self, wait: float) -> None:
+        """Record how long a call waited for its turn."""
+        self.queue_wait.add(wait)
+        self._async_notify(METRIC_QUEUE_WAIT)
+
+    @callback
+    def async_set_queue_depth(self, depth: int) -> None:
+        """Update the number of calls waiting for their turn."""
+        if depth != self.queue_depth:
+            self.queue_depth = depth
+            self._async_notify(METRIC_QUEUE_DEPTH)
+
+    @callback
+    def async_record_normalization(self, changed: bool, cache_hit: bool) -> None:
+        """Record a normalized segment of a message.
+
+        cache_hit tells whether the normalized segment was cached while
+        the segment as written was not.
+        """
+        self.text_normalized += 1
+        self.text_changed += changed
+        self.text_cache_hits += cache_hit
+        self._async_notify(METRIC_TEXT)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        return {
+            "tts": {
+                "time_to_first_chunk": self.tts_first_chunk.as_dict(),
+                "synthesis_time": self.tts_total.as_dict(),
+                "bytes_received": self.tts_bytes,
+                "chunks_received": self.tts_chunks,
+                "status_codes": dict(self.tts_status_codes),
+            },
+            "stt": {
+                "time_to_first_partial": self.stt_first_partial.as_dict(),
+                "time_to_final": self.stt_final.as_dict(),
+                "audio_seconds_uploaded": round(self.stt_audio_seconds, 3),
+                "status_codes": dict(self.stt_status_codes),
+            },
+            "scheduler": {
+                "queue_wait": self.queue_wait.as_dict(),
+                "queue_depth": self.queue_depth,
+            },
+            "text": {
+                "normalized": self.text_normalized,
+                "changed": self.text_changed,
+                "cache_hits_gained": self.text_cache_hits,
+            },
+        }
+
+    @callback
+    def _async_notify(self, group: str) -> None:
+        """Call the listeners of a metric group."""
+        for update_callback in list(self._listeners[group]):
+            update_callback()
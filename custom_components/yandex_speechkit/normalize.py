@@ -0,0 +1,91 @@
+"""Canonical form of TTS messages, so that variants of a phrase share audio."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+RULE_SEPARATOR = "=>"
+
+# Languages read "21,5" rather than "21.5"
+DECIMAL_COMMA_LANGUAGES = frozenset({"de-DE", "kk-KK", "ru-RU", "uz-UZ"})
+
+WHITESPACE = re.compile(r"\s+")
+SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([.,!?;:…»”)\]])")
+REPEATED_PUNCTUATION = re.compile(r"([!?,;:])\1+")
+ELLIPSIS = re.compile(r"\.{3,}")
+DASHES = re.compile(r"\s[-‐‑‒–―]\s")
+QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'"})
+# A decimal with a dot, as produced by templates, but not a date or version
+DECIMAL = re.compile(r"(?<![\d.])(\d+)\.(\d+)(?![.\d])")
+
+
+def parse_rewrite_rules(text: str) -> list[tuple[re.Pattern[str], str]]:
+    """Parse rules written one per line as "pattern => replacement".
+
+    Patterns are regular expressions. Raises ValueError if a line is not
+    a valid rule.
+    """
+    rules = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        pattern, separator, replacement = line.partition(RULE_SEPARATOR)
+        if not separator or not pattern.strip():
+            raise ValueError(f"Not a rewrite rule: {line}")
+        try:
+            rules.append((re.compile(pattern.strip()), replacement.strip()))
+        except re.error as err:
+            raise ValueError(f"Invalid pattern in {line}: {err}") from err
+    return rules
+
+
+class TextNormalizer:
+    """Rewrite messages into a canonical form before synthesis.
+
+    Unicode, whitespace, punctuation and decimal numbers are normalized
+    and user rules applied, so that templated messages differing only in
+    formatting map to the same phrase cache entry. Letter case is kept:
+    SpeechKit spells out words written in capitals.
+    """
+
+    def __init__(
+        self,
+        rules: list[tuple[re.Pattern[str], str]],
+        decimals: int | None = None,
+    ) -> None:
+        """Initialize the normalizer.
+
+        decimals rounds numbers to that many decimal places, None keeps
+        their precision.
+        """
+        self._rules = rules
+        self._decimals = decimals
+
+    def normalize(self, text: str, language: str) -> str:
+        """Return the canonical form of a message."""
+        text = unicodedata.normalize("NFC", text).translate(QUOTES)
+        text = WHITESPACE.sub(" ", text).strip()
+        for pattern, replacement in self._rules:
+            text = pattern.sub(replacement, text)
+
+        text = ELLIPSIS.sub("…", text)
+        text = DASHES.sub(" — ", text)
+        text = REPEATED_PUNCTUATION.sub(r"\1", text)
+        text = SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+
+        separator = "," if language in DECIMAL_COMMA_LANGUAGES else "."
+        return DECIMAL.sub(lambda match: self._number(match, separator), text)
+
+    def _number(self, match: re.Match[str], separator: str) -> str:
+        """Format a decimal number without trailing zeros."""
+        whole, fraction = match.groups()
+        if self._decimals is not None:
+            rounded = round(float(f"{whole}.{fraction}"), self._decimals)
+            whole, _, fraction = f"{rounded:.{self._decimals}f}".partition(".")
+        fraction = fraction.rstrip("0")
+        return f"{whole}{separator}{fraction}" if fraction else whole
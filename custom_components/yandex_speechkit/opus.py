@@ -0,0 +1,116 @@
+"""Ogg Opus encoding of recognition audio."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import importlib
+import random
+import struct
+from collections.abc import AsyncGenerator, AsyncIterable
+
+from homeassistant.core import HomeAssistant
+
+from .audio import OGG_BOS, OGG_EOS, build_ogg_page
+from .const import LOGGER
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_BITRATE = 24000
+OPUS_FRAME_MS = 20
+OPUS_PRE_SKIP = 312
+OPUS_GRANULE_RATE = 48000
+
+
+def opus_available() -> bool:
+    """Return whether libopus can be loaded.
+
+    opuslib is an optional dependency. Importing it looks up the shared
+    library, so this blocks and must run in an executor.
+    """
+    try:
+        importlib.import_module("opuslib")
+    except Exception as err:  # noqa: BLE001
+        # opuslib raises a bare Exception when libopus is missing
+        LOGGER.warning("Opus encoding is unavailable: %s", err)
+        return False
+    return True
+
+
+class OggOpusEncoder:
+    """Encode 16-bit mono PCM into an Ogg Opus stream.
+
+    Every call to encode returns complete pages, so the output can be
+    uploaded right away. Encoding is CPU-bound and is meant to run in an
+    executor thread.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        """Initialize the encoder."""
+        import opuslib
+
+        self._encoder = opuslib.Encoder(sample_rate, 1, "voip")
+        self._encoder.bitrate = OPUS_BITRATE
+        self._sample_rate = sample_rate
+        self._frame_size = sample_rate * OPUS_FRAME_MS // 1000
+        self._frame_bytes = self._frame_size * 2
+        self._serial = random.getrandbits(32)
+        self._sequence = 0
+        self._granule = OPUS_PRE_SKIP
+        self._buffer = b""
+
+    def headers(self) -> bytes:
+        """Return the OpusHead and OpusTags pages."""
+        head = b"OpusHead" + struct.pack(
+            "<BBHIhB", 1, 1, OPUS_PRE_SKIP, self._sample_rate, 0, 0
+        )
+        vendor = b"homeassistant-yandex-speechkit"
+        tags = b"OpusTags" + struct.pack("<I", len(vendor)) + vendor + b"\0\0\0\0"
+        return self._page(OGG_BOS, 0, [head]) + self._page(0, 0, [tags])
+
+    def encode(self, pcm: bytes) -> bytes:
+        """Encode PCM into pages holding every complete frame."""
+        self._buffer += pcm
+        packets = []
+        while len(self._buffer) >= self._frame_bytes:
+            frame = self._buffer[: self._frame_bytes]
+            self._buffer = self._buffer[self._frame_bytes :]
+            packets.append(self._encoder.encode(frame, self._frame_size))
+        if not packets:
+            return b""
+        return self._audio_page(0, packets)
+
+    def finish(self) -> bytes:
+        """Encode the remaining audio and close the stream."""
+        packets = []
+        if self._buffer:
+            frame = self._buffer.ljust(self._frame_bytes, b"\0")
+            self._buffer = b""
+            packets.append(self._encoder.encode(frame, self._frame_size))
+        return self._audio_page(OGG_EOS, packets)
+
+    def _audio_page(self, header_type: int, packets: list[bytes]) -> bytes:
+        """Build a page of audio packets, advancing the granule position."""
+        self._granule += len(packets) * OPUS_GRANULE_RATE * OPUS_FRAME_MS // 1000
+        return self._page(header_type, self._granule, packets)
+
+    def _page(self, header_type: int, granule: int, packets: list[bytes]) -> bytes:
+        """Build the next page of the stream."""
+        page = build_ogg_page(
+            header_type, granule, self._serial, self._sequence, packets
+        )
+        self._sequence += 1
+        return page
+
+
+async def encode_ogg_opus(
+    hass: HomeAssistant, stream: AsyncIterable[bytes], sample_rate: int
+) -> AsyncGenerator[bytes]:
+    """Transcode a PCM stream into Ogg Opus in an executor thread."""
+    encoder = await hass.async_add_executor_job(OggOpusEncoder, sample_rate)
+    yield encoder.headers()
+    async for chunk in stream:
+        if data := await hass.async_add_executor_job(encoder.encode, chunk):
+            yield data
+    yield await hass.async_add_executor_job(encoder.finish)
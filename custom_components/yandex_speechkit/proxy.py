@@ -0,0 +1,164 @@
+"""Delivery of proxied TTS messages to a Yandex.Station speaker."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+from homeassistant.components.media_player.const import (
+    ATTR_MEDIA_CONTENT_ID,
+    ATTR_MEDIA_CONTENT_TYPE,
+    SERVICE_PLAY_MEDIA,
+)
+from homeassistant.components.media_player.const import DOMAIN as MEDIA_DOMAIN
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import LOGGER
+
+SENTENCE_ENDINGS = (".", "!", "?", "…")
+
+
+@dataclass
+class _Message:
+    """A message waiting to be delivered."""
+
+    text: str
+    delivered: asyncio.Future[None] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class SpeakerDeliveryQueue:
+    """Deliver messages to one speaker, one utterance at a time.
+
+    Messages arriving within merge_window of the first pending one are
+    spoken as a single utterance, messages already waiting in the queue
+    are not queued twice. When the queue is full the oldest message is
+    dropped, since a stale announcement is the least useful one.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        speaker: str,
+        media_type: str,
+        merge_window: float,
+        max_size: int,
+    ) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._config_entry = config_entry
+        self._speaker = speaker
+        self._media_type = media_type
+        self._merge_window = merge_window
+        self._max_size = max_size
+        self._pending: list[_Message] = []
+        self._playing: list[_Message] = []
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+
+    def async_enqueue(self, text: str) -> asyncio.Future[None]:
+        """Queue a message, return a future resolved once it is delivered."""
+        for message in (*self._playing, *self._pending):
+            if message.text == text:
+                LOGGER.debug("Dropping a duplicate message for %s", self._speaker)
+                return message.delivered
+
+        if len(self._pending) >= self._max_size:
+            dropped = self._pending.pop(0)
+            LOGGER.warning(
+                "Delivery queue for %s is full, dropping '%s'",
+                self._speaker,
+                dropped.text,
+            )
+            _fail(dropped, HomeAssistantError("Dropped from a full delivery queue"))
+
+        message = _Message(text)
+        self._pending.append(message)
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = self._config_entry.async_create_background_task(
+                self._hass, self._run(), f"yandex_speechkit_proxy_{self._speaker}"
+            )
+        return message.delivered
+
+    async def _run(self) -> None:
+        """Deliver queued messages until the queue runs dry."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            if self._merge_window:
+                merge_until = loop.time() + self._merge_window
+                while (remaining := merge_until - loop.time()) > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except TimeoutError:
+                        break
+                batch, self._pending = self._pending, []
+            else:
+                batch = [self._pending.pop(0)]
+            self._wakeup.clear()
+
+            self._playing = batch
+            try:
+                await self._play(merge_messages([message.text for message in batch]))
+            except Exception as err:  # noqa: BLE001
+                LOGGER.error("Error proxying TTS request to Yandex.Station: %s", err)
+                for message in batch:
+                    _fail(message, err)
+            else:
+                for message in batch:
+                    message.delivered.set_result(None)
+            finally:
+                self._playing = []
+
+    def async_shutdown(self) -> None:
+        """Stop delivering and cancel the messages still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+        for message in (*self._playing, *self._pending):
+            if not message.delivered.done():
+                _fail(message, HomeAssistantError("Delivery queue shut down"))
+        self._pending = []
+
+    async def _play(self, text: str) -> None:
+        """Send an utterance to the speaker and wait for the service call."""
+        LOGGER.debug("Proxying TTS request to Yandex.Station...")
+        await self._hass.services.async_call(
+            MEDIA_DOMAIN,
+            SERVICE_PLAY_MEDIA,
+            {
+                ATTR_MEDIA_CONTENT_ID: text,
+                ATTR_MEDIA_CONTENT_TYPE: self._media_type,
+                ATTR_ENTITY_ID: self._speaker,
+            },
+            blocking=True,
+        )
+
+
+def _fail(message: _Message, err: Exception) -> None:
+    """Resolve a message as undelivered."""
+    message.delivered.set_exception(err)
+    # Nobody may be waiting for a fire-and-forget message
+    message.delivered.exception()
+
+
+def merge_messages(texts: list[str]) -> str:
+    """Join messages into one utterance with a pause between them."""
+    if len(texts) == 1:
+        return texts[0]
+    sentences = []
+    for text in texts:
+        text = text.strip()
+        if text and not text.endswith(SENTENCE_ENDINGS):
+            text += "."
+        sentences.append(text)
+    return " ".join(sentence for sentence in sentences if sentence)
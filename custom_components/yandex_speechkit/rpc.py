@@ -0,0 +1,133 @@
+"""Deadlines, retries and hedging of SpeechKit calls."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+import grpc
+from grpc import aio
+
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from .scheduler import YandexSpeechKitScheduler
+
+RETRYABLE_STATUS_CODES = frozenset(
+    {
+        grpc.StatusCode.ABORTED,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        grpc.StatusCode.UNAVAILABLE,
+    }
+)
+# Statuses meaning the service could not be reached, anything else is an
+# answer from the service and proves it is up
+UNREACHABLE_STATUS_CODES = frozenset(
+    {grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.UNAVAILABLE}
+)
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 2.0
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+
+
+class CircuitOpenError(aio.AioRpcError):
+    """Raised instead of calling an endpoint known to be unreachable."""
+
+    def __init__(self, details: str) -> None:
+        """Initialize the error."""
+        super().__init__(
+            grpc.StatusCode.UNAVAILABLE, aio.Metadata(), aio.Metadata(), details
+        )
+
+
+def is_retryable(err: grpc.RpcError) -> bool:
+    """Return whether a failed call may succeed when repeated."""
+    if isinstance(err, CircuitOpenError):
+        return False
+    code = getattr(err, "code", None)
+    return callable(code) and code() in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return a full-jitter delay before the next retry."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+def deadline_exceeded(details: str) -> aio.AioRpcError:
+    """Create the error raised when a client-side deadline passes."""
+    return aio.AioRpcError(
+        grpc.StatusCode.DEADLINE_EXCEEDED, aio.Metadata(), aio.Metadata(), details
+    )
+
+
+async def first_response(
+    start: Callable[[], aio.UnaryStreamCall],
+    timeout: float,
+    hedge_delay: float | None = None,
+    scheduler: YandexSpeechKitScheduler | None = None,
+) -> tuple[aio.UnaryStreamCall, Any]:
+    """Start a call and wait for its first response.
+
+    If hedge_delay passes without a response, a duplicate call is started
+    and the first one to respond wins, the other is cancelled. The
+    duplicate takes a turn from the scheduler for as long as both calls
+    run, and is skipped if the scheduler has no turn to spare. Raises
+    DEADLINE_EXCEEDED if nothing arrives within timeout. The response is
+    EOF if the call finished without sending anything.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    hedge_at = None if hedge_delay is None else loop.time() + hedge_delay
+    pending: dict[asyncio.Future[Any], aio.UnaryStreamCall] = {}
+    error: grpc.RpcError | None = None
+    hedged = False
+
+    def launch() -> None:
+        call = start()
+        pending[asyncio.ensure_future(call.read())] = call
+
+    launch()
+    try:
+        while pending:
+            wake = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=max(0, wake - loop.time()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                if hedge_at is None or loop.time() >= deadline:
+                    break
+                hedge_at = None
+                if scheduler is not None and not scheduler.try_acquire():
+                    LOGGER.debug("Not hedging the call, the API is busy")
+                    continue
+                LOGGER.debug("No response after %.2f s, hedging the call", hedge_delay)
+                hedged = True
+                launch()
+                continue
+
+            for read in done:
+                call = pending.pop(read)
+                try:
+                    return call, read.result()
+                except grpc.RpcError as err:
+                    error = err
+    finally:
+        for read, call in pending.items():
+            read.cancel()
+            call.cancel()
+        if hedged and scheduler is not None:
+            scheduler.release()
+
+    if error is not None:
+        raise error
+    raise deadline_exceeded(f"No response within {timeout} s")
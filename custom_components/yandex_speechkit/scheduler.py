@@ -0,0 +1,140 @@
+"""Priority scheduling of SpeechKit calls."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+from .metrics import YandexSpeechKitMetrics
+
+
+class Priority(IntEnum):
+    """Priority of a SpeechKit call, lower values run first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class YandexSpeechKitScheduler:
+    """Admit calls to the API under a rate limit and a concurrency cap.
+
+    The rate limit is a token bucket refilled at rate tokens per second
+    and holding up to one second worth of tokens, 0 disables it. Waiting
+    calls are admitted by priority and then in arrival order, so voice
+    commands overtake queued automation announcements.
+    """
+
+    def __init__(
+        self, metrics: YandexSpeechKitMetrics, rate: float, concurrency: int
+    ) -> None:
+        """Initialize the scheduler."""
+        self._metrics = metrics
+        self._rate = rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._concurrency = concurrency
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._refilled: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        """Wait for a turn to call the API and hold it until the call ends."""
+        loop = asyncio.get_running_loop()
+        queued = loop.time()
+        if not self._waiters and self._try_start(loop):
+            self._metrics.async_record_queue_wait(0)
+        else:
+            waiter: asyncio.Future[None] = loop.create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            # No call may be running to release a slot, so wait for the
+            # next token here rather than for a release
+            self._dispatch()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Admitted just before being cancelled, give the turn on
+                    self.release()
+                raise
+            self._metrics.async_record_queue_wait(loop.time() - queued)
+
+        try:
+            yield
+        finally:
+            self.release()
+
+    def try_acquire(self) -> bool:
+        """Take a turn right away if no call is waiting and limits allow.
+
+        A successful call must be paired with release.
+        """
+        if self._waiters:
+            return False
+        if not self._try_start(asyncio.get_running_loop()):
+            return False
+        self._metrics.async_record_queue_wait(0)
+        return True
+
+    def _try_start(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Take a concurrency slot and a token if both are available."""
+        if self._active >= self._concurrency:
+            return False
+        if self._rate:
+            now = loop.time()
+            if self._refilled is not None:
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._refilled) * self._rate
+                )
+            self._refilled = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        self._active += 1
+        return True
+
+    def release(self) -> None:
+        """Free a concurrency slot and admit waiting calls."""
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiting calls in priority order while limits allow."""
+        loop = asyncio.get_running_loop()
+        while self._waiters:
+            if self._waiters[0][2].done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_start(loop):
+                break
+            _, _, waiter = heapq.heappop(self._waiters)
+            waiter.set_result(None)
+
+        self._metrics.async_set_queue_depth(len(self._waiters))
+        if (
+            self._waiters
+            and self._rate
+            and self._active < self._concurrency
+            and self._timer is None
+        ):
+            # Out of tokens, try again once the next one is available
+            self._timer = loop.call_later(
+                (1 - self._tokens) / self._rate, self._on_timer
+            )
+
+    def _on_timer(self) -> None:
+        """Admit waiting calls after the bucket has been refilled."""
+        self._timer = None
+        self._dispatch()
@@ -0,0 +1,207 @@
+"""Diagnostic sensors of the Yandex SpeechKit integration."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfDataSize, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from .const import DOMAIN, LOGGER
+from .metrics import (
+    METRIC_QUEUE_DEPTH,
+    METRIC_QUEUE_WAIT,
+    METRIC_STT,
+    METRIC_TEXT,
+    METRIC_TTS,
+    RollingHistogram,
+    YandexSpeechKitMetrics,
+)
+
+# Busy periods record several calls a second, write the state at most
+# this often, in seconds
+STATE_WRITE_COOLDOWN = 5
+
+
+@dataclass(frozen=True, kw_only=True)
+class YandexSpeechKitSensorEntityDescription(SensorEntityDescription):
+    """Describes a Yandex SpeechKit metrics sensor."""
+
+    metric: str
+    value_fn: Callable[[YandexSpeechKitMetrics], StateType]
+    attributes_fn: Callable[[YandexSpeechKitMetrics], dict[str, Any]] | None = None
+
+
+def _median_ms(histogram: RollingHistogram) -> float | None:
+    """Return the median of a histogram in milliseconds."""
+    if (value := histogram.percentile(50)) is None:
+        return None
+    return round(value * 1000)
+
+
+def _percentiles_ms(histogram: RollingHistogram) -> dict[str, Any]:
+    """Return the tail percentiles of a histogram in milliseconds."""
+    attributes: dict[str, Any] = {"count": histogram.count}
+    for percent in (95, 99):
+        if (value := histogram.percentile(percent)) is not None:
+            attributes[f"p{percent}"] = round(value * 1000)
+    return attributes
+
+
+def _latency_sensor(
+    key: str,
+    metric: str,
+    histogram: Callable[[YandexSpeechKitMetrics], RollingHistogram],
+) -> YandexSpeechKitSensorEntityDescription:
+    """Describe a sensor reporting the median of a latency histogram."""
+    return YandexSpeechKitSensorEntityDescription(
+        key=key,
+        translation_key=key,
+        metric=metric,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: _median_ms(histogram(metrics)),
+        attributes_fn=lambda metrics: _percentiles_ms(histogram(metrics)),
+    )
+
+
+SENSORS: tuple[YandexSpeechKitSensorEntityDescription, ...] = (
+    _latency_sensor(
+        "tts_first_chunk", METRIC_TTS, lambda metrics: metrics.tts_first_chunk
+    ),
+    _latency_sensor(
+        "tts_synthesis_time", METRIC_TTS, lambda metrics: metrics.tts_total
+    ),
+    YandexSpeechKitSensorEntityDescription(
+        key="tts_bytes_received",
+        translation_key="tts_bytes_received",
+        metric=METRIC_TTS,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfDataSize.BYTES,
+        suggested_unit_of_measurement=UnitOfDataSize.KILOBYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.tts_bytes,
+        attributes_fn=lambda metrics: {
+            "chunks": metrics.tts_chunks,
+            "status_codes": dict(metrics.tts_status_codes),
+        },
+    ),
+    _latency_sensor(
+        "stt_first_partial", METRIC_STT, lambda metrics: metrics.stt_first_partial
+    ),
+    _latency_sensor("stt_final", METRIC_STT, lambda metrics: metrics.stt_final),
+    YandexSpeechKitSensorEntityDescription(
+        key="stt_audio_uploaded",
+        translation_key="stt_audio_uploaded",
+        metric=METRIC_STT,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=1,
+        value_fn=lambda metrics: metrics.stt_audio_seconds,
+        attributes_fn=lambda metrics: {
+            "status_codes": dict(metrics.stt_status_codes),
+        },
+    ),
+    YandexSpeechKitSensorEntityDescription(
+        key="queue_depth",
+        translation_key="queue_depth",
+        metric=METRIC_QUEUE_DEPTH,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: metrics.queue_depth,
+    ),
+    _latency_sensor(
+        "queue_wait", METRIC_QUEUE_WAIT, lambda metrics: metrics.queue_wait
+    ),
+    YandexSpeechKitSensorEntityDescription(
+        key="tts_text_changed",
+        translation_key="tts_text_changed",
+        metric=METRIC_TEXT,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.text_changed,
+        attributes_fn=lambda metrics: {
+            "normalized": metrics.text_normalized,
+            "cache_hits_gained": metrics.text_cache_hits,
+        },
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Yandex SpeechKit sensors."""
+    async_add_entities(
+        YandexSpeechKitSensorEntity(config_entry, description)
+        for description in SENSORS
+    )
+
+
+class YandexSpeechKitSensorEntity(SensorEntity):
+    """A sensor reporting a Yandex SpeechKit metric."""
+
+    entity_description: YandexSpeechKitSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        config_entry: ConfigEntry,
+        description: YandexSpeechKitSensorEntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
+        )
+        self._metrics: YandexSpeechKitMetrics = config_entry.runtime_data.metrics
+
+    async def async_added_to_hass(self) -> None:
+        """Refresh the state whenever the metric changes."""
+        debouncer = Debouncer(
+            self.hass,
+            LOGGER,
+            cooldown=STATE_WRITE_COOLDOWN,
+            immediate=True,
+            function=self.async_write_ha_state,
+        )
+        self.async_on_remove(debouncer.async_shutdown)
+        self.async_on_remove(
+            self._metrics.async_add_listener(
+                debouncer.async_schedule_call, self.entity_description.metric
+            )
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._metrics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the percentiles and counters of the metric."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self._metrics)
@@ -0,0 +1,124 @@
+"""Services of the Yandex SpeechKit integration."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import voluptuous as vol
+from homeassistant.components.tts import ATTR_AUDIO_OUTPUT, ATTR_VOICE
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_SAMPLE_RATE,
+    DEFAULT_LANG,
+    DOMAIN,
+    LOGGER,
+    TTS_LANGUAGES,
+    TTS_OUTPUT_FORMATS,
+    TTS_PCM_SAMPLE_RATES,
+    TTS_VOICES,
+)
+
+SERVICE_PRELOAD = "preload"
+
+ATTR_MESSAGES = "messages"
+ATTR_LANGUAGE = "language"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_RATE_LIMIT = "rate_limit"
+
+PRELOAD_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_MESSAGES): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_LANGUAGE, default=DEFAULT_LANG): vol.In(TTS_LANGUAGES),
+        vol.Optional(ATTR_VOICE): cv.string,
+        vol.Optional(ATTR_AUDIO_OUTPUT): vol.In(TTS_OUTPUT_FORMATS),
+        vol.Optional(ATTR_SAMPLE_RATE): vol.All(
+            vol.Coerce(int), vol.In(TTS_PCM_SAMPLE_RATES)
+        ),
+        vol.Optional(ATTR_CONCURRENCY, default=2): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=16)
+        ),
+        vol.Optional(ATTR_RATE_LIMIT, default=5): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_preload(call: ServiceCall) -> ServiceResponse:
+        """Synthesize a list of phrases into the phrase cache."""
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is None or entry.domain != DOMAIN:
+            raise ServiceValidationError(f"Config entry {entry_id} not found")
+        if entry.state is not ConfigEntryState.LOADED:
+            raise ServiceValidationError(f"Config entry {entry.title} is not loaded")
+        if entry.runtime_data.cache is None:
+            raise ServiceValidationError(
+                "The phrase cache is disabled, enable it in the integration options"
+            )
+        if (tts_entity := entry.runtime_data.tts_entity) is None:
+            raise ServiceValidationError("The TTS entity is not set up")
+        language = call.data[ATTR_LANGUAGE]
+        if (voice := call.data.get(ATTR_VOICE)) is not None and (
+            voice not in TTS_VOICES[language]
+        ):
+            raise ServiceValidationError(
+                f"Voice {voice} does not speak {language}, expected one of: "
+                + ", ".join(TTS_VOICES[language])
+            )
+
+        options = {
+            key: call.data[key]
+            for key in (ATTR_VOICE, ATTR_AUDIO_OUTPUT, ATTR_SAMPLE_RATE)
+            if key in call.data
+        }
+        preload = tts_entity.async_preload(
+            call.data[ATTR_MESSAGES],
+            language,
+            options,
+            call.data[ATTR_CONCURRENCY],
+            call.data[ATTR_RATE_LIMIT],
+        )
+
+        if call.return_response:
+            return await preload
+
+        async def preload_in_background() -> None:
+            result = await preload
+            LOGGER.info(
+                "Preloading finished: %s synthesized, %s already cached, %s failed",
+                result["synthesized"],
+                result["cached"],
+                len(result["failed"]),
+            )
+
+        entry.async_create_background_task(
+            hass, preload_in_background(), "yandex_speechkit_preload"
+        )
+        return None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PRELOAD,
+        async_preload,
+        schema=PRELOAD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
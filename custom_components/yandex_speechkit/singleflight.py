@@ -0,0 +1,94 @@
+"""Deduplication of concurrent identical requests."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class _Stream(Generic[_T]):
+    """A shared stream, the items it produced so far and its consumers."""
+
+    items: list[_T] = field(default_factory=list)
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    done: bool = False
+    error: Exception | None = None
+    consumers: int = 0
+    task: asyncio.Task[None] = field(init=False)
+
+
+class SingleFlight:
+    """Run at most one stream per key and share its items.
+
+    Callers arriving while a stream with the same key is in flight follow
+    that stream instead of starting their own: they get the items produced
+    so far, then every new item as it arrives. Exceptions are delivered to
+    every consumer. A consumer leaving only cancels the stream itself once
+    nobody else is consuming it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._streams: dict[Hashable, _Stream[Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of streams in flight."""
+        return len(self._streams)
+
+    async def stream(
+        self, key: Hashable, factory: Callable[[], AsyncIterator[_T]]
+    ) -> AsyncGenerator[_T]:
+        """Yield the items of the stream for key, starting it if needed."""
+        if (shared := self._streams.get(key)) is None:
+            shared = _Stream()
+            self._streams[key] = shared
+            shared.task = asyncio.create_task(self._pump(key, shared, factory()))
+
+        shared.consumers += 1
+        position = 0
+        try:
+            while True:
+                if position < len(shared.items):
+                    position += 1
+                    yield shared.items[position - 1]
+                elif shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                else:
+                    shared.changed.clear()
+                    await shared.changed.wait()
+        finally:
+            shared.consumers -= 1
+            if not shared.consumers and not shared.done:
+                self._forget(key, shared)
+                shared.task.cancel()
+
+    async def _pump(
+        self, key: Hashable, shared: _Stream[_T], source: AsyncIterator[_T]
+    ) -> None:
+        """Collect the items of a stream for its consumers."""
+        try:
+            async for item in source:
+                shared.items.append(item)
+                shared.changed.set()
+        except Exception as err:  # noqa: BLE001
+            shared.error = err
+        finally:
+            shared.done = True
+            shared.changed.set()
+            self._forget(key, shared)
+
+    def _forget(self, key: Hashable, shared: _Stream[Any]) -> None:
+        """Drop a finished or abandoned stream from the registry."""
+        if self._streams.get(key) is shared:
+            del self._streams[key]
@@ -4,12 +4,11 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import asyncio
 from typing import AsyncGenerator, AsyncIterable
 
 import grpc
 import yandex.cloud.ai.stt.v3.stt_pb2 as stt_pb2
-import yandex.cloud.ai.stt.v3.stt_service_pb2_grpc as stt_service_pb2_grpc
-from grpc import aio
 from homeassistant.components.stt import (
     AudioBitRates,
     AudioChannels,
@@ -22,11 +21,42 @@ from homeassistant.components.stt import (
     SpeechToTextEntity,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_ENTITY_ID
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, LOGGER, STT_LANGUAGES
+from .audio import coalesce_audio
+from .const import (
+    CONF_RETRIES,
+    CONF_STT_CHUNK_DURATION,
+    CONF_STT_INTERIM_RESULTS,
+    CONF_STT_OPUS,
+    CONF_STT_TIMEOUT,
+    CONF_STT_TRAILING_SILENCE,
+    CONF_STT_TRIM_SILENCE,
+    DEFAULT_RETRIES,
+    DEFAULT_STT_CHUNK_DURATION,
+    DEFAULT_STT_INTERIM_RESULTS,
+    DEFAULT_STT_OPUS,
+    DEFAULT_STT_TIMEOUT,
+    DEFAULT_STT_TRAILING_SILENCE,
+    DEFAULT_STT_TRIM_SILENCE,
+    DOMAIN,
+    EVENT_STT_INTERIM_RESULT,
+    LOGGER,
+    STT_LANGUAGES,
+)
+from .metrics import rpc_status
+from .opus import OPUS_SAMPLE_RATES, encode_ogg_opus, opus_available
+from .rpc import backoff_delay, is_retryable
+from .scheduler import Priority
+from .vad import trim_silence
+
+# Rough Opus bitrate of voice satellites, used to size batches of Ogg audio.
+OPUS_BYTES_PER_SECOND = 3000
+# Recognition events that change the text heard so far
+INTERIM_EVENTS = ("partial", "final", "final_refinement")
 
 
 async def async_setup_entry(
@@ -35,13 +65,16 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Yandex SpeechKit via config entry."""
-    async_add_entities([YandexSpeechKitSTTEntity(config_entry)])
+    transcode_opus = config_entry.options.get(
+        CONF_STT_OPUS, DEFAULT_STT_OPUS
+    ) and await hass.async_add_executor_job(opus_available)
+    async_add_entities([YandexSpeechKitSTTEntity(config_entry, transcode_opus)])
 
 
 class YandexSpeechKitSTTEntity(SpeechToTextEntity):
     """Yandex STT entity."""
 
-    def __init__(self, config_entry: ConfigEntry) -> None:
+    def __init__(self, config_entry: ConfigEntry, transcode_opus: bool) -> None:
         """Initialize the entity."""
 
         self._attr_unique_id = f"{config_entry.entry_id}"
@@ -53,6 +86,7 @@ class YandexSpeechKitSTTEntity(SpeechToTextEntity):
             entry_type=dr.DeviceEntryType.SERVICE,
         )
         self._config_entry = config_entry
+        self._transcode_opus = transcode_opus
 
     @property
     def supported_languages(self) -> list[str]:
@@ -99,48 +133,224 @@ class YandexSpeechKitSTTEntity(SpeechToTextEntity):
     ) -> SpeechResult:
         """Process an audio stream to STT service."""
 
+        transcode = (
+            self._transcode_opus
+            and metadata.codec == AudioCodecs.PCM
+            and metadata.bit_rate == AudioBitRates.BITRATE_16
+            and metadata.channel == AudioChannels.CHANNEL_MONO
+            and metadata.sample_rate in OPUS_SAMPLE_RATES
+        )
+
+        loop = asyncio.get_running_loop()
+        first_audio: float | None = None
+        first_partial: float | None = None
+        uploaded = 0
+        audio_started = False
+
+        async def measure(
+            audio: AsyncIterable[bytes],
+        ) -> AsyncGenerator[bytes, None]:
+            nonlocal first_audio, uploaded
+            async for chunk in audio:
+                if first_audio is None:
+                    first_audio = loop.time()
+                uploaded += len(chunk)
+                yield chunk
+
         async def request_generator() -> AsyncGenerator[stt_pb2.StreamingRequest, None]:
-            recognize_options = self._get_recognition_options(metadata)
+            nonlocal audio_started
+            recognize_options = self._get_recognition_options(metadata, transcode)
             LOGGER.debug("Sending the message with recognition params...")
             yield stt_pb2.StreamingRequest(session_options=recognize_options)
 
-            async for audio_bytes in stream:
+            audio_started = True
+            audio = measure(
+                self._coalesce(metadata, self._trim_silence(metadata, stream))
+            )
+            if transcode:
+                audio = encode_ogg_opus(self.hass, audio, metadata.sample_rate)
+            async for audio_bytes in audio:
                 yield stt_pb2.StreamingRequest(
                     chunk=stt_pb2.AudioChunk(data=audio_bytes)
                 )
 
-        async def recognize_stream(stub, api_key):
-            responses = stub.RecognizeStreaming(
+        async def recognize_stream(stub):
+            nonlocal first_partial
+            call = stub.RecognizeStreaming(
                 request_generator(),
-                metadata=(("authorization", f"Api-Key {api_key}"),),
+                timeout=self._config_entry.options.get(
+                    CONF_STT_TIMEOUT, DEFAULT_STT_TIMEOUT
+                ),
+            )
+            finals: dict[int, list[str]] = {}
+            unrefined: set[int] = set()
+            utterance_ended = False
+            interim_results = self._config_entry.options.get(
+                CONF_STT_INTERIM_RESULTS, DEFAULT_STT_INTERIM_RESULTS
             )
-            alternatives = []
-            async for response in responses:
-                if response.WhichOneof("Event") != "final_refinement":
-                    continue
-                alternatives += [
-                    a.text
-                    for a in response.final_refinement.normalized_text.alternatives
-                ]
-            return alternatives
-
-        cred = grpc.ssl_channel_credentials()
-        async with aio.secure_channel("stt.api.cloud.yandex.net:443", cred) as channel:
-            stub = stt_service_pb2_grpc.RecognizerStub(channel)
-            api_key = self._config_entry.data["api_key"]
+            partial = ""
+            hypothesis = None
+
+            async for response in call:
+                event = response.WhichOneof("Event")
+                if first_partial is None and event in ("partial", "final"):
+                    first_partial = loop.time()
+                if event == "partial":
+                    alternatives = response.partial.alternatives
+                    partial = alternatives[0].text if alternatives else ""
+                elif event == "final":
+                    partial = ""
+                    index = response.audio_cursors.final_index
+                    finals[index] = [a.text for a in response.final.alternatives]
+                    if any(finals[index]):
+                        unrefined.add(index)
+                elif event == "final_refinement":
+                    index = response.final_refinement.final_index
+                    finals[index] = [
+                        a.text
+                        for a in response.final_refinement.normalized_text.alternatives
+                    ]
+                    unrefined.discard(index)
+                elif event == "eou_update":
+                    utterance_ended = True
+
+                if interim_results and event in INTERIM_EVENTS:
+                    heard = [texts[0] for _, texts in sorted(finals.items()) if texts]
+                    recognized = " ".join(filter(None, [*heard, partial]))
+                    if recognized:
+                        self._fire_interim_result(
+                            metadata.language,
+                            recognized,
+                            final=event != "partial",
+                            stable=recognized == hypothesis,
+                        )
+                    hypothesis = recognized
+
+                if utterance_ended and not unrefined and any(map(any, finals.values())):
+                    # The server has the final result, stop uploading audio
+                    # even if the local stream is still open.
+                    LOGGER.debug("End of utterance detected, closing the stream")
+                    call.cancel()
+                    break
+
+            return [text for index in sorted(finals) for text in finals[index] if text]
+
+        def record(status: str) -> None:
+            to_partial = to_final = None
+            if first_audio is not None:
+                to_final = loop.time() - first_audio
+                if first_partial is not None:
+                    to_partial = first_partial - first_audio
+            self._config_entry.runtime_data.metrics.async_record_stt(
+                status,
+                to_partial,
+                to_final,
+                uploaded / self._bytes_per_second(metadata),
+            )
+
+        channels = self._config_entry.runtime_data.channels
+        scheduler = self._config_entry.runtime_data.scheduler
+        retries = self._config_entry.options.get(CONF_RETRIES, DEFAULT_RETRIES)
+        for attempt in range(retries + 1):
             try:
-                alternatives = await recognize_stream(stub, api_key)
-                if not alternatives:
-                    return SpeechResult(None, SpeechResultState.ERROR)
-                return SpeechResult(" ".join(alternatives), SpeechResultState.SUCCESS)
+                endpoint = channels.stt.best
+                # Fail right away instead of timing out while unreachable
+                channels.stt_breaker.check()
+                async with scheduler.slot(Priority.INTERACTIVE):
+                    alternatives = await recognize_stream(endpoint.stub)
+                channels.stt_breaker.record(None)
+                break
             except grpc.RpcError as err:
-                LOGGER.error("Error occurred during speech recognition: %s", err)
-                return SpeechResult(None, SpeechResultState.ERROR)
+                channels.stt_breaker.record(err)
+                channels.stt.record(endpoint, err)
+                # The audio stream can only be read once, so a call is only
+                # repeated if it failed before any audio was requested.
+                if attempt == retries or audio_started or not is_retryable(err):
+                    record(rpc_status(err))
+                    LOGGER.error("Error occurred during speech recognition: %s", err)
+                    return SpeechResult(None, SpeechResultState.ERROR)
+                delay = backoff_delay(attempt)
+                LOGGER.debug(
+                    "STT call failed with %s, retrying in %.2f s",
+                    rpc_status(err),
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+        record(grpc.StatusCode.OK.name)
+        if not alternatives:
+            return SpeechResult(None, SpeechResultState.ERROR)
+        return SpeechResult(" ".join(alternatives), SpeechResultState.SUCCESS)
+
+    def _fire_interim_result(
+        self, language: str, text: str, final: bool, stable: bool
+    ) -> None:
+        """Fire an event with the text recognized so far.
+
+        final tells whether the text ends with a finished utterance rather
+        than a partial hypothesis, stable whether it is unchanged since the
+        previous event, e.g. while the speaker pauses.
+        """
+        self.hass.bus.async_fire(
+            EVENT_STT_INTERIM_RESULT,
+            {
+                ATTR_ENTITY_ID: self.entity_id,
+                "language": language,
+                "text": text,
+                "final": final,
+                "stable": stable,
+            },
+        )
+
+    def _trim_silence(
+        self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
+    ) -> AsyncIterable[bytes]:
+        """Drop silence around the utterance from raw PCM audio."""
+        if (
+            not self._config_entry.options.get(
+                CONF_STT_TRIM_SILENCE, DEFAULT_STT_TRIM_SILENCE
+            )
+            or metadata.codec != AudioCodecs.PCM
+            or metadata.bit_rate != AudioBitRates.BITRATE_16
+            or metadata.channel != AudioChannels.CHANNEL_MONO
+        ):
+            return stream
+
+        return trim_silence(
+            stream,
+            metadata.sample_rate,
+            self._config_entry.options.get(
+                CONF_STT_TRAILING_SILENCE, DEFAULT_STT_TRAILING_SILENCE
+            ),
+        )
+
+    def _coalesce(
+        self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
+    ) -> AsyncIterable[bytes]:
+        """Batch incoming audio into chunks of the configured duration."""
+        duration_ms = self._config_entry.options.get(
+            CONF_STT_CHUNK_DURATION, DEFAULT_STT_CHUNK_DURATION
+        )
+        if not duration_ms:
+            return stream
+
+        target_size = self._bytes_per_second(metadata) * duration_ms // 1000
+        return coalesce_audio(stream, target_size, duration_ms / 1000)
+
+    @staticmethod
+    def _bytes_per_second(metadata: SpeechMetadata) -> int:
+        """Return the approximate data rate of the incoming audio."""
+        if metadata.codec == AudioCodecs.OPUS:
+            return OPUS_BYTES_PER_SECOND
+        return metadata.sample_rate * metadata.bit_rate // 8 * metadata.channel
 
     def _get_recognition_options(
-        self, metadata: SpeechMetadata
+        self, metadata: SpeechMetadata, transcode: bool = False
     ) -> stt_pb2.StreamingOptions:
-        """Get recognition options based on metadata."""
+        """Get recognition options based on metadata.
+
+        With transcode set, PCM audio is uploaded as Ogg Opus.
+        """
         return stt_pb2.StreamingOptions(
             recognition_model=stt_pb2.RecognitionModelOptions(
                 audio_format=(
@@ -149,7 +359,7 @@ class YandexSpeechKitSTTEntity(SpeechToTextEntity):
                             container_audio_type=stt_pb2.ContainerAudio.OGG_OPUS,
                         )
                     )
-                    if metadata.codec == AudioCodecs.OPUS
+                    if metadata.codec == AudioCodecs.OPUS or transcode
                     else stt_pb2.AudioFormatOptions(
                         raw_audio=stt_pb2.RawAudio(
                             audio_encoding=stt_pb2.RawAudio.LINEAR16_PCM,
@@ -0,0 +1,120 @@
+"""Text segmentation for Yandex SpeechKit synthesis."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import re
+
+MAX_SEGMENT_LENGTH = 249
+UNSAFE_MAX_SEGMENT_LENGTH = 1000
+
+SENTENCE_END = re.compile(r"[.!?…]+[\"'»”)\]]*\s+|\n+")
+CLAUSE_END = re.compile(r"[,;:—–]\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+class SentenceSplitter:
+    """Split text arriving in arbitrary chunks into sentences.
+
+    A sentence is emitted once its terminating punctuation is followed by
+    whitespace, so decimal numbers and abbreviations inside a chunk are
+    not cut. Sentences longer than the maximum length are further split
+    at clause boundaries or, failing that, at whitespace.
+    """
+
+    def __init__(self, max_length: int = MAX_SEGMENT_LENGTH) -> None:
+        """Initialize the splitter."""
+        self._max_length = max_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the sentences completed by it."""
+        self._buffer += text
+        segments: list[str] = []
+
+        while match := SENTENCE_END.search(self._buffer):
+            segments.extend(self._split_long(self._buffer[: match.end()]))
+            self._buffer = self._buffer[match.end() :]
+
+        while len(self._buffer) > self._max_length:
+            head, self._buffer = self._split_once(self._buffer)
+            segments.append(head)
+
+        return [segment for segment in map(str.strip, segments) if segment]
+
+    def flush(self) -> list[str]:
+        """Return whatever text is left in the buffer."""
+        segments = self._split_long(self._buffer)
+        self._buffer = ""
+        return [segment for segment in map(str.strip, segments) if segment]
+
+    def _split_long(self, text: str) -> list[str]:
+        """Split a sentence into parts no longer than the maximum length."""
+        parts = []
+        while len(text) > self._max_length:
+            head, text = self._split_once(text)
+            parts.append(head)
+        parts.append(text)
+        return parts
+
+    def _split_once(self, text: str) -> tuple[str, str]:
+        """Cut the longest head that fits, preferring clause boundaries."""
+        window = text[: self._max_length]
+        for pattern in (CLAUSE_END, WHITESPACE):
+            if boundaries := [m.end() for m in pattern.finditer(window)]:
+                return text[: boundaries[-1]], text[boundaries[-1] :]
+        return window, text[self._max_length :]
+
+
+class SegmentSplitter:
+    """Split text arriving in arbitrary chunks into segments to synthesize.
+
+    Sentences completed by a chunk are held back until the next chunk
+    arrives or the text ends, and then packed into as few segments as
+    fit. A message arriving in one chunk thus goes out in as few requests
+    as possible, while generated text is still spoken sentence by
+    sentence as it streams in.
+    """
+
+    def __init__(self, max_length: int = MAX_SEGMENT_LENGTH) -> None:
+        """Initialize the splitter."""
+        self._max_length = max_length
+        self._sentences = SentenceSplitter(max_length)
+        self._pending: list[str] = []
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the segments ready to be synthesized."""
+        segments = self._pack(self._pending)
+        self._pending = self._sentences.feed(text)
+        return segments
+
+    def flush(self) -> list[str]:
+        """Return the segments left at the end of the text."""
+        segments = self._pack(self._pending + self._sentences.flush())
+        self._pending = []
+        return segments
+
+    def _pack(self, sentences: list[str]) -> list[str]:
+        """Join consecutive sentences into segments of up to the maximum length."""
+        segments: list[str] = []
+        for sentence in sentences:
+            if segments and len(segments[-1]) + 1 + len(sentence) <= self._max_length:
+                segments[-1] += " " + sentence
+            else:
+                segments.append(sentence)
+        return segments
+
+
+def split_text(text: str, max_length: int = MAX_SEGMENT_LENGTH) -> list[str]:
+    """Split a complete text into as few segments as possible.
+
+    Text is split exactly as if it arrived in one chunk of a stream, so
+    that both paths synthesize, and cache, the same segments. Text that
+    fits into one request is kept whole, a sentence is only cut when it
+    does not fit into a segment on its own.
+    """
+    splitter = SegmentSplitter(max_length)
+    return splitter.feed(text) + splitter.flush()
@@ -6,39 +6,68 @@
 
 from __future__ import annotations
 
+import asyncio
 import io
 import os
+import tempfile
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import aclosing
 from typing import Any
 
 import grpc
 import yandex.cloud.ai.tts.v3.tts_pb2 as tts_pb2
-import yandex.cloud.ai.tts.v3.tts_service_pb2_grpc as tts_service_pb2_grpc
 from grpc import aio
-from homeassistant.components.media_player.const import (
-    ATTR_MEDIA_CONTENT_ID,
-    ATTR_MEDIA_CONTENT_TYPE,
-)
-from homeassistant.components.media_player.const import DOMAIN as MEDIA_DOMAIN
-from homeassistant.components.media_player.const import SERVICE_PLAY_MEDIA
 from homeassistant.components.tts import (
     ATTR_AUDIO_OUTPUT,
+    ATTR_PREFERRED_FORMAT,
+    ATTR_PREFERRED_SAMPLE_CHANNELS,
+    ATTR_PREFERRED_SAMPLE_RATE,
     ATTR_VOICE,
     TextToSpeechEntity,
+    TTSAudioRequest,
+    TTSAudioResponse,
     TtsAudioType,
     Voice,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_ENTITY_ID, CONF_API_KEY
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .audio import AudioJoiner, join_segments, patch_wav_file, wav_header
+from .channels import EndpointGroup
 from .const import (
+    ATTR_PRIORITY,
+    ATTR_SAMPLE_RATE,
+    CONF_PROXY_FIRE_AND_FORGET,
     CONF_PROXY_MEDIA_TYPE,
+    CONF_PROXY_MERGE_WINDOW,
+    CONF_PROXY_QUEUE_SIZE,
     CONF_PROXY_SPEAKER,
+    CONF_RETRIES,
+    CONF_TTS_CONCURRENCY,
+    CONF_TTS_FIRST_CHUNK_TIMEOUT,
+    CONF_TTS_HEDGING,
+    CONF_TTS_LONG_TEXT,
+    CONF_TTS_NORMALIZE,
+    CONF_TTS_REWRITE_RULES,
+    CONF_TTS_ROUND_NUMBERS,
+    CONF_TTS_TIMEOUT,
     CONF_TTS_UNSAFE,
     DEFAULT_LANG,
     DEFAULT_OUTPUT_CONTAINER,
+    DEFAULT_PCM_SAMPLE_RATE,
+    DEFAULT_PROXY_FIRE_AND_FORGET,
+    DEFAULT_PROXY_MERGE_WINDOW,
+    DEFAULT_PROXY_QUEUE_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TTS_CONCURRENCY,
+    DEFAULT_TTS_FIRST_CHUNK_TIMEOUT,
+    DEFAULT_TTS_HEDGING,
+    DEFAULT_TTS_LONG_TEXT,
+    DEFAULT_TTS_NORMALIZE,
+    DEFAULT_TTS_TIMEOUT,
     DEFAULT_VOICE,
     DOMAIN,
     LOGGER,
@@ -47,8 +76,33 @@ from .const import (
     PROXY_ERROR,
     TTS_LANGUAGES,
     TTS_OUTPUT_CONTAINERS,
+    TTS_OUTPUT_PCM,
+    TTS_PCM_SAMPLE_RATES,
     TTS_VOICES,
 )
+from .metrics import rpc_status
+from .normalize import TextNormalizer, parse_rewrite_rules
+from .proxy import SpeakerDeliveryQueue
+from .rpc import (
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    backoff_delay,
+    first_response,
+    is_retryable,
+)
+from .scheduler import Priority
+from .singleflight import SingleFlight
+from .text import (
+    MAX_SEGMENT_LENGTH,
+    UNSAFE_MAX_SEGMENT_LENGTH,
+    SegmentSplitter,
+    split_text,
+)
+
+_ChunkQueue = asyncio.Queue[bytes | Exception | None]
+
+SPOOL_WRITE_SIZE = 256 * 1024
+SPOOL_READ_SIZE = 64 * 1024
 
 
 async def async_setup_entry(
@@ -57,7 +111,9 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Yandex SpeechKit text-to-speech."""
-    entities: list[TextToSpeechEntity] = [YandexSpeechKitTTSEntity(config_entry)]
+    tts_entity = YandexSpeechKitTTSEntity(config_entry)
+    config_entry.runtime_data.tts_entity = tts_entity
+    entities: list[TextToSpeechEntity] = [tts_entity]
 
     if config_entry.options.get(CONF_PROXY_SPEAKER):
         entities.append(YandexStationTTSProxyEntity(hass, config_entry))
@@ -80,6 +136,15 @@ class YandexSpeechKitTTSEntity(TextToSpeechEntity):
         )
 
         self._config_entry = config_entry
+        self._in_flight = SingleFlight()
+        self._normalizer: TextNormalizer | None = None
+        if config_entry.options.get(CONF_TTS_NORMALIZE, DEFAULT_TTS_NORMALIZE):
+            self._normalizer = TextNormalizer(
+                parse_rewrite_rules(
+                    config_entry.options.get(CONF_TTS_REWRITE_RULES, "")
+                ),
+                config_entry.options.get(CONF_TTS_ROUND_NUMBERS),
+            )
 
     @property
     def supported_languages(self):
@@ -94,7 +159,7 @@ class YandexSpeechKitTTSEntity(TextToSpeechEntity):
     @property
     def supported_options(self) -> list[str]:
         """Return list of supported options like voice, emotion."""
-        return [ATTR_VOICE, ATTR_AUDIO_OUTPUT]
+        return [ATTR_VOICE, ATTR_AUDIO_OUTPUT, ATTR_SAMPLE_RATE, ATTR_PRIORITY]
 
     @property
     def default_options(self) -> dict[str, Any]:
@@ -116,57 +181,552 @@ class YandexSpeechKitTTSEntity(TextToSpeechEntity):
     ) -> TtsAudioType:
         """Get TTS audio from Yandex SpeechKit."""
         LOGGER.debug("Starting TTS synthesis for message: %s", message)
+        options = self._resolve_options(options)
+        segments = self._segments(message, language, options)
 
-        output_container = options[ATTR_AUDIO_OUTPUT]
-        container_audio_type = TTS_OUTPUT_CONTAINERS.get(
-            output_container, TTS_OUTPUT_CONTAINERS[DEFAULT_OUTPUT_CONTAINER]
+        long_text = self._config_entry.options.get(
+            CONF_TTS_LONG_TEXT, DEFAULT_TTS_LONG_TEXT
         )
-        voice = options[ATTR_VOICE]
-        unsafe_mode = self._config_entry.options.get(CONF_TTS_UNSAFE, False)
-
-        if len(message) > 249 and not unsafe_mode:
-            LOGGER.info(
-                "Message is too long (%s characters) and will be truncated",
-                len(message),
+        if long_text and len(message) > long_text:
+            return await self._synthesize_long_text(segments, language, options)
+
+        output_container = _output_extension(options)
+        if len(segments) > 1:
+            LOGGER.debug("Synthesizing the message in %s segments", len(segments))
+
+        concurrency = asyncio.Semaphore(self._concurrency)
+        priority = self._priority(options)
+        tasks = [
+            asyncio.create_task(
+                self._synthesize_segment(text, language, options, concurrency, priority)
             )
+            for text in segments
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except grpc.RpcError as err:
+            for task in tasks:
+                task.cancel()
+            LOGGER.error("Error occurred during Yandex SpeechKit TTS call: %s", err)
+            return (None, None)
 
-        request = self._create_tts_request(
-            message, container_audio_type, voice, unsafe_mode
+        if not results or not all(results):
+            LOGGER.error("No audio data received from Yandex SpeechKit")
+            return (None, None)
+
+        try:
+            audio = join_segments(output_container, results)
+        except ValueError as err:
+            raise HomeAssistantError(
+                f"Yandex SpeechKit returned invalid {output_container} audio: {err}"
+            ) from err
+
+        LOGGER.debug("TTS synthesis completed successfully")
+        return (output_container, audio)
+
+    async def async_stream_tts_audio(
+        self, request: TTSAudioRequest
+    ) -> TTSAudioResponse:
+        """Stream TTS audio from Yandex SpeechKit as the text arrives.
+
+        The incoming text is split into sentences, which are synthesized
+        packed into segments as soon as they are complete, so speech
+        starts before the whole message has been generated. Once the text exceeds the
+        long text threshold, the rest of the audio is spooled to disk.
+        """
+        options = self._resolve_options(request.options)
+        output_container = _output_extension(options)
+        long_text = self._config_entry.options.get(
+            CONF_TTS_LONG_TEXT, DEFAULT_TTS_LONG_TEXT
         )
+        received = 0
+        LOGGER.debug("Starting streaming TTS synthesis")
+
+        async def segment_gen() -> AsyncGenerator[str]:
+            nonlocal received
+            splitter = SegmentSplitter(self._max_segment_length)
+            async for text in request.message_gen:
+                received += len(text)
+                for segment in splitter.feed(text):
+                    yield self._normalize(segment, request.language, options)
+            for segment in splitter.flush():
+                yield self._normalize(segment, request.language, options)
+
+        async def data_gen() -> AsyncGenerator[bytes]:
+            audio = self._stream_segments(
+                segment_gen(), request.language, options, self._priority(options)
+            )
+            if long_text:
+                audio = self._spool_audio(audio, lambda: received > long_text)
+            try:
+                async for chunk in audio:
+                    yield chunk
+            except grpc.RpcError as err:
+                LOGGER.error("Error occurred during Yandex SpeechKit TTS call: %s", err)
+                raise HomeAssistantError(
+                    f"Yandex SpeechKit TTS call failed: {err}"
+                ) from err
+
+        return TTSAudioResponse(output_container, data_gen())
 
-        cred = grpc.ssl_channel_credentials()
-        async with aio.secure_channel("tts.api.cloud.yandex.net:443", cred) as channel:
-            stub = tts_service_pb2_grpc.SynthesizerStub(channel)
+    async def _synthesize_long_text(
+        self, texts: list[str], language: str, options: dict[str, Any]
+    ) -> TtsAudioType:
+        """Synthesize a long message a few segments at a time.
+
+        Segments are synthesized in order and appended to the result as
+        they arrive, so besides the result only the segments in flight
+        are kept in memory instead of all of them plus the joined copy.
+        Audio is only spooled to disk when streamed, as the whole result
+        has to be returned here anyway.
+        """
+        output_container = _output_extension(options)
+        LOGGER.debug("Synthesizing a long message in %s segments", len(texts))
 
-            api_key = self._config_entry.data[CONF_API_KEY]
+        async def segments() -> AsyncGenerator[str]:
+            for text in texts:
+                yield text
 
+        audio = io.BytesIO()
+        try:
+            async for chunk in self._stream_segments(
+                segments(), language, options, self._priority(options)
+            ):
+                audio.write(chunk)
+        except grpc.RpcError as err:
+            LOGGER.error("Error occurred during Yandex SpeechKit TTS call: %s", err)
+            return (None, None)
+
+        if output_container == "wav":
+            patch_wav_file(audio)
+        if not (audio := audio.getvalue()):
+            LOGGER.error("No audio data received from Yandex SpeechKit")
+            return (None, None)
+        return (output_container, audio)
+
+    async def _spool_audio(
+        self, audio: AsyncGenerator[bytes], spill: Callable[[], bool]
+    ) -> AsyncGenerator[bytes]:
+        """Pass audio through, spooling it to disk once spill returns True.
+
+        From then on the rest of the audio is synthesized as fast as
+        SpeechKit delivers it and written to a temporary file, which is
+        read back in chunks as playback goes on. A slow consumer no longer
+        holds API calls open, and the unplayed audio is not kept in memory.
+        """
+        async with aclosing(audio):
+            async for chunk in audio:
+                yield chunk
+                if spill():
+                    break
+            else:
+                return
+
+            LOGGER.debug("Long text, spooling the rest of the audio to disk")
+            async with aclosing(self._read_back_spool(audio)) as spooled:
+                async for chunk in spooled:
+                    yield chunk
+
+    async def _read_back_spool(
+        self, audio: AsyncIterator[bytes]
+    ) -> AsyncGenerator[bytes]:
+        """Write audio to a temporary file and yield it back as it is written."""
+        spool = await self.hass.async_add_executor_job(tempfile.TemporaryFile)
+        fd = spool.fileno()
+        in_flight: set[asyncio.Future[Any]] = set()
+        written = 0
+        reader_waiting = False
+        progress = asyncio.Event()
+
+        async def run_io(func: Callable[..., Any], *args: Any) -> Any:
+            # Shielded, so the file is never closed under a running job
+            job = self.hass.async_add_executor_job(func, *args)
+            in_flight.add(job)
+            job.add_done_callback(in_flight.discard)
+            return await asyncio.shield(job)
+
+        async def write() -> None:
+            nonlocal written, reader_waiting
+            buffer = bytearray()
             try:
-                audio = await self._fetch_audio_data(stub, request, api_key)
-                if audio:
-                    LOGGER.debug("TTS synthesis completed successfully")
-                    return (output_container, audio)
+                async for chunk in audio:
+                    buffer += chunk
+                    # Hand audio over right away when playback caught up
+                    if len(buffer) >= SPOOL_WRITE_SIZE or reader_waiting:
+                        await run_io(os.pwrite, fd, bytes(buffer), written)
+                        written += len(buffer)
+                        buffer.clear()
+                        reader_waiting = False
+                        progress.set()
+                if buffer:
+                    await run_io(os.pwrite, fd, bytes(buffer), written)
+                    written += len(buffer)
+            finally:
+                progress.set()
+
+        writer = asyncio.create_task(write())
+        offset = 0
+        try:
+            while True:
+                if offset < written:
+                    size = min(SPOOL_READ_SIZE, written - offset)
+                    data = await run_io(os.pread, fd, size, offset)
+                    offset += len(data)
+                    yield data
+                elif writer.done():
+                    # Raise the error the synthesis failed with, if any
+                    writer.result()
+                    return
                 else:
-                    LOGGER.error("No audio data received from Yandex SpeechKit")
-                    return (None, None)
-            except grpc.RpcError as err:
-                LOGGER.error("Error occurred during Yandex SpeechKit TTS call: %s", err)
-                return (None, None)
+                    progress.clear()
+                    reader_waiting = True
+                    await progress.wait()
+        finally:
+            writer.cancel()
+            await asyncio.wait([writer, *in_flight])
+            await self.hass.async_add_executor_job(spool.close)
+
+    async def _stream_segments(
+        self,
+        segments: AsyncIterator[str],
+        language: str,
+        options: dict[str, Any],
+        priority: Priority,
+    ) -> AsyncGenerator[bytes]:
+        """Synthesize text segments ahead of playback and yield them in order.
+
+        A segment is only started once fewer than the configured number of
+        segments are waiting to be consumed, so audio piles up in memory
+        for at most that many segments when playback falls behind.
+        """
+        container = _output_extension(options)
+        joiner = AudioJoiner(container)
+        unconsumed = asyncio.Semaphore(self._concurrency)
+        segment_queues: asyncio.Queue[_ChunkQueue | None] = asyncio.Queue()
+        tasks: list[asyncio.Task[None]] = []
+
+        async def synthesize(text: str, chunks: _ChunkQueue) -> None:
+            try:
+                async for chunk in self._stream_segment(
+                    text, language, options, priority
+                ):
+                    chunks.put_nowait(chunk)
+            except Exception as err:  # noqa: BLE001
+                # Raised by the consumer once it reaches this segment
+                chunks.put_nowait(err)
+            finally:
+                chunks.put_nowait(None)
+
+        async def produce() -> None:
+            try:
+                async for text in segments:
+                    await unconsumed.acquire()
+                    LOGGER.debug("Synthesizing segment: %s", text)
+                    chunks: _ChunkQueue = asyncio.Queue()
+                    tasks.append(asyncio.create_task(synthesize(text, chunks)))
+                    segment_queues.put_nowait(chunks)
+            except Exception as err:  # noqa: BLE001
+                # Raised by the consumer after the segments read so far
+                chunks = asyncio.Queue()
+                chunks.put_nowait(err)
+                chunks.put_nowait(None)
+                segment_queues.put_nowait(chunks)
+            finally:
+                segment_queues.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (chunks := await segment_queues.get()) is not None:
+                joiner.start_segment()
+                while (item := await chunks.get()) is not None:
+                    if isinstance(item, Exception):
+                        raise item
+                    if data := joiner.feed(item):
+                        yield data
+                unconsumed.release()
+            if data := joiner.finish():
+                yield data
+        except ValueError as err:
+            raise HomeAssistantError(
+                f"Yandex SpeechKit returned invalid {container} audio: {err}"
+            ) from err
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+
+    async def async_preload(
+        self,
+        messages: list[str],
+        language: str,
+        options: dict[str, Any],
+        concurrency: int,
+        rate_limit: float,
+    ) -> dict[str, Any]:
+        """Synthesize messages into the phrase cache ahead of their first use.
+
+        Messages are split and normalized the same way as for playback, so
+        every segment lands under the key a later announcement, streamed or
+        not, will look up. rate_limit
+        is the maximum number of requests started per second, 0 for none.
+        """
+        if self._config_entry.runtime_data.cache is None:
+            raise HomeAssistantError("The phrase cache is disabled")
+        options = self._resolve_options({**self.default_options, **options})
+        limiter = asyncio.Semaphore(concurrency)
+        interval = 1 / rate_limit if rate_limit else 0
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+        result: dict[str, Any] = {
+            "total": len(messages),
+            "synthesized": 0,
+            "cached": 0,
+            "failed": [],
+        }
+        done = 0
+
+        async def throttle() -> None:
+            nonlocal next_start
+            now = loop.time()
+            delay = next_start - now
+            next_start = max(now, next_start) + interval
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        async def preload(message: str) -> None:
+            nonlocal done
+            segments = [
+                text
+                for text in self._segments(message, language, options)
+                if not self._is_cached(text, language, options)
+            ]
+            try:
+                for text in segments:
+                    await throttle()
+                    if not await self._synthesize_segment(
+                        text, language, options, limiter, Priority.BULK
+                    ):
+                        raise HomeAssistantError("No audio data received")
+            except (grpc.RpcError, HomeAssistantError) as err:
+                LOGGER.warning("Failed to preload '%s': %s", message, err)
+                result["failed"].append({"message": message, "error": str(err)})
+            else:
+                result["synthesized" if segments else "cached"] += 1
+
+            done += 1
+            if done % 10 == 0 or done == len(messages):
+                LOGGER.info("Preloaded %s of %s phrases", done, len(messages))
+
+        await asyncio.gather(*(preload(message) for message in messages))
+        return result
+
+    async def _synthesize_segment(
+        self,
+        text: str,
+        language: str,
+        options: dict[str, Any],
+        concurrency: asyncio.Semaphore,
+        priority: Priority = Priority.NORMAL,
+    ) -> bytes:
+        """Synthesize a segment, serving it from the phrase cache if possible."""
+        async with concurrency:
+            return b"".join(
+                [
+                    chunk
+                    async for chunk in self._stream_segment(
+                        text, language, options, priority
+                    )
+                ]
+            )
+
+    async def _stream_segment(
+        self,
+        text: str,
+        language: str,
+        options: dict[str, Any],
+        priority: Priority = Priority.NORMAL,
+    ) -> AsyncGenerator[bytes]:
+        """Stream a segment, serving it from the phrase cache if possible.
+
+        Concurrent requests for the same segment, e.g. one announcement
+        played on several speakers, share a single API call. Requests
+        joining late get the audio received so far, then follow along.
+        """
+        cache = self._config_entry.runtime_data.cache
+        if cache is not None:
+            key = cache.make_key(
+                text, options[ATTR_VOICE], language, _output_format(options)
+            )
+            if (audio := await cache.async_get(key)) is not None:
+                yield audio
+                return
+
+        async def synthesize() -> AsyncGenerator[bytes]:
+            runtime_data = self._config_entry.runtime_data
+            _, request = self._prepare_tts_request(text, options)
+            chunks = []
+            async with runtime_data.scheduler.slot(priority):
+                async for chunk in self._stream_audio_data(
+                    runtime_data.channels.tts, request
+                ):
+                    chunks.append(chunk)
+                    yield chunk
+
+            if cache is not None and chunks:
+                await cache.async_put(key, b"".join(chunks))
+
+        flight_key = (text, options[ATTR_VOICE], language, _output_format(options))
+        async for chunk in self._in_flight.stream(flight_key, synthesize):
+            yield chunk
+
+    def _segments(
+        self, message: str, language: str, options: dict[str, Any]
+    ) -> list[str]:
+        """Return the normalized segments a complete message is synthesized in.
+
+        Matches the segments of the message streamed in a single chunk.
+        """
+        return [
+            self._normalize(text, language, options)
+            for text in split_text(message, self._max_segment_length)
+        ]
+
+    def _normalize(self, text: str, language: str, options: dict[str, Any]) -> str:
+        """Return the canonical form of a segment if normalization is enabled."""
+        if self._normalizer is None:
+            return text
+        normalized = self._normalizer.normalize(text, language)
+        changed = normalized != text
+        self._config_entry.runtime_data.metrics.async_record_normalization(
+            changed,
+            changed
+            and self._is_cached(normalized, language, options)
+            and not self._is_cached(text, language, options),
+        )
+        return normalized
+
+    def _is_cached(self, text: str, language: str, options: dict[str, Any]) -> bool:
+        """Return whether the audio of a segment is in the phrase cache."""
+        cache = self._config_entry.runtime_data.cache
+        return cache is not None and cache.has(
+            cache.make_key(text, options[ATTR_VOICE], language, _output_format(options))
+        )
+
+    @property
+    def _max_segment_length(self) -> int:
+        """Return the longest text sent in a single request."""
+        if self._config_entry.options.get(CONF_TTS_UNSAFE, False):
+            return UNSAFE_MAX_SEGMENT_LENGTH
+        return MAX_SEGMENT_LENGTH
+
+    @property
+    def _hedge_delay(self) -> float | None:
+        """Return how long to wait for a first chunk before hedging a call.
+
+        The delay is the p95 time to first chunk seen so far, None while
+        hedging is disabled or there are too few samples.
+        """
+        if not self._config_entry.options.get(CONF_TTS_HEDGING, DEFAULT_TTS_HEDGING):
+            return None
+        histogram = self._config_entry.runtime_data.metrics.tts_first_chunk
+        if histogram.count < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, histogram.percentile(95) or 0)
+
+    @property
+    def _concurrency(self) -> int:
+        """Return how many segments may be synthesized at once."""
+        return self._config_entry.options.get(
+            CONF_TTS_CONCURRENCY, DEFAULT_TTS_CONCURRENCY
+        )
+
+    @staticmethod
+    def _priority(options: dict[str, Any]) -> Priority:
+        """Return the scheduling priority of a synthesis.
+
+        The priority option picks it explicitly. Otherwise replies of the
+        assist pipeline, which alone asks for a preferred format, are
+        interactive and everything else, e.g. automation announcements,
+        is normal.
+        """
+        if (priority := options.get(ATTR_PRIORITY)) is not None:
+            try:
+                return Priority[str(priority).upper()]
+            except KeyError:
+                raise HomeAssistantError(
+                    f"Unknown priority {priority}, expected one of: "
+                    + ", ".join(member.name.lower() for member in Priority)
+                ) from None
+        if ATTR_PREFERRED_FORMAT in options:
+            return Priority.INTERACTIVE
+        return Priority.NORMAL
+
+    @staticmethod
+    def _resolve_options(options: dict[str, Any]) -> dict[str, Any]:
+        """Pick the output format, honouring the format Home Assistant prefers.
+
+        Home Assistant converts the audio with ffmpeg whenever it differs
+        from the preferred format. A preferred container is synthesized
+        directly, a preferred WAV is requested as raw PCM at the nearest
+        supported sample rate, so no MP3 has to be decoded on the way.
+        """
+        options = dict(options)
+        preferred = options.get(ATTR_PREFERRED_FORMAT)
+        if preferred == "wav" and options.get(ATTR_PREFERRED_SAMPLE_CHANNELS, 1) == 1:
+            options[ATTR_AUDIO_OUTPUT] = TTS_OUTPUT_PCM
+            if ATTR_PREFERRED_SAMPLE_RATE in options:
+                options[ATTR_SAMPLE_RATE] = options[ATTR_PREFERRED_SAMPLE_RATE]
+        elif preferred in TTS_OUTPUT_CONTAINERS:
+            options[ATTR_AUDIO_OUTPUT] = preferred
+
+        if options.get(ATTR_AUDIO_OUTPUT) == TTS_OUTPUT_PCM:
+            rate = int(options.get(ATTR_SAMPLE_RATE) or DEFAULT_PCM_SAMPLE_RATE)
+            options[ATTR_SAMPLE_RATE] = min(
+                TTS_PCM_SAMPLE_RATES, key=lambda supported: abs(supported - rate)
+            )
+        return options
+
+    def _prepare_tts_request(
+        self, message: str, options: dict[str, Any]
+    ) -> tuple[str, tts_pb2.UtteranceSynthesisRequest]:
+        """Resolve the options and create a TTS request for the message."""
+        output_container = options[ATTR_AUDIO_OUTPUT]
+        if output_container == TTS_OUTPUT_PCM:
+            audio_format = tts_pb2.AudioFormatOptions(
+                raw_audio=tts_pb2.RawAudio(
+                    audio_encoding=tts_pb2.RawAudio.LINEAR16_PCM,
+                    sample_rate_hertz=options[ATTR_SAMPLE_RATE],
+                )
+            )
+        else:
+            container_audio_type = tts_pb2.ContainerAudio.ContainerAudioType.Value(
+                TTS_OUTPUT_CONTAINERS.get(
+                    output_container, TTS_OUTPUT_CONTAINERS[DEFAULT_OUTPUT_CONTAINER]
+                )
+            )
+            audio_format = tts_pb2.AudioFormatOptions(
+                container_audio=tts_pb2.ContainerAudio(
+                    container_audio_type=container_audio_type
+                )
+            )
+        voice = options[ATTR_VOICE]
+        unsafe_mode = self._config_entry.options.get(CONF_TTS_UNSAFE, False)
+
+        return _output_extension(options), self._create_tts_request(
+            message, audio_format, voice, unsafe_mode
+        )
 
     def _create_tts_request(
         self,
         message: str,
-        container_audio_type: tts_pb2.ContainerAudio.ContainerAudioType.ValueType,
+        audio_format: tts_pb2.AudioFormatOptions,
         voice: str,
         unsafe_mode: bool,
     ) -> tts_pb2.UtteranceSynthesisRequest:
         """Create a TTS request."""
         return tts_pb2.UtteranceSynthesisRequest(
             text=message if unsafe_mode else message[:249],
-            output_audio_spec=tts_pb2.AudioFormatOptions(
-                container_audio=tts_pb2.ContainerAudio(
-                    container_audio_type=container_audio_type
-                )
-            ),
+            output_audio_spec=audio_format,
             hints=[
                 tts_pb2.Hints(voice=voice),
             ],
@@ -174,24 +734,113 @@ class YandexSpeechKitTTSEntity(TextToSpeechEntity):
             unsafe_mode=unsafe_mode,
         )
 
-    async def _fetch_audio_data(
-        self, stub, request: tts_pb2.UtteranceSynthesisRequest, api_key: str
-    ) -> bytes | None:
-        """Fetch audio data from Yandex SpeechKit."""
-        responses = stub.UtteranceSynthesis(
-            request,
-            metadata=(("authorization", f"Api-Key {api_key}"),),
+    async def _stream_audio_data(
+        self,
+        endpoints: EndpointGroup,
+        request: tts_pb2.UtteranceSynthesisRequest,
+    ) -> AsyncGenerator[bytes]:
+        """Yield audio chunks from Yandex SpeechKit as they arrive.
+
+        The call has to deliver its first chunk and finish within the
+        configured deadlines. Until the first chunk arrives, failures with
+        a retryable status are retried after a jittered backoff. While the
+        circuit breaker is open, calls fail without reaching the network.
+        """
+        metrics = self._config_entry.runtime_data.metrics
+        breaker = self._config_entry.runtime_data.channels.tts_breaker
+        options = self._config_entry.options
+        first_chunk_timeout = options.get(
+            CONF_TTS_FIRST_CHUNK_TIMEOUT, DEFAULT_TTS_FIRST_CHUNK_TIMEOUT
         )
+        total_timeout = options.get(CONF_TTS_TIMEOUT, DEFAULT_TTS_TIMEOUT)
+        retries = options.get(CONF_RETRIES, DEFAULT_RETRIES)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first_chunk: float | None = None
+        size = chunks = 0
+        header = b""
+        if request.output_audio_spec.HasField("raw_audio"):
+            # Raw audio has no header of its own, wrap it to pass it on as WAV
+            header = wav_header(request.output_audio_spec.raw_audio.sample_rate_hertz)
+
+        def start() -> aio.UnaryStreamCall:
+            return endpoint.stub.UtteranceSynthesis(
+                request,
+                timeout=max(0, total_timeout - (loop.time() - started)),
+            )
 
-        audio = io.BytesIO()
-        async for response in responses:
-            if response.audio_chunk.data:
-                audio.write(response.audio_chunk.data)
-            else:
-                LOGGER.warning("Empty audio chunk received from Yandex SpeechKit")
+        try:
+            for attempt in range(retries + 1):
+                breaker.check()
+                # Picked for every attempt, so a retry goes to another
+                # endpoint if this one could not be reached
+                endpoint = endpoints.best
+                remaining = total_timeout - (loop.time() - started)
+                try:
+                    call, response = await first_response(
+                        start,
+                        min(first_chunk_timeout, remaining),
+                        self._hedge_delay,
+                        self._config_entry.runtime_data.scheduler,
+                    )
+                    break
+                except grpc.RpcError as err:
+                    breaker.record(err)
+                    endpoints.record(endpoint, err)
+                    if attempt == retries or not is_retryable(err):
+                        raise
+                    delay = backoff_delay(attempt)
+                    LOGGER.debug(
+                        "TTS call failed with %s, retrying in %.2f s",
+                        rpc_status(err),
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
+
+            try:
+                while response is not aio.EOF:
+                    if response.audio_chunk.data:
+                        size += len(response.audio_chunk.data)
+                        chunks += 1
+                        if first_chunk is None:
+                            first_chunk = loop.time() - started
+                            yield header + response.audio_chunk.data
+                        else:
+                            yield response.audio_chunk.data
+                    else:
+                        LOGGER.warning(
+                            "Empty audio chunk received from Yandex SpeechKit"
+                        )
+                    response = await call.read()
+            except grpc.RpcError as err:
+                breaker.record(err)
+                endpoints.record(endpoint, err)
+                raise
+            finally:
+                call.cancel()
+        except grpc.RpcError as err:
+            metrics.async_record_tts(
+                rpc_status(err), first_chunk, loop.time() - started, size, chunks
+            )
+            raise
+        breaker.record(None)
+        metrics.async_record_tts(
+            grpc.StatusCode.OK.name, first_chunk, loop.time() - started, size, chunks
+        )
 
-        audio.seek(0)
-        return audio.read()
+
+def _output_format(options: dict[str, Any]) -> str:
+    """Return the output format, including the sample rate of raw PCM."""
+    if options[ATTR_AUDIO_OUTPUT] == TTS_OUTPUT_PCM:
+        return f"{TTS_OUTPUT_PCM}{options[ATTR_SAMPLE_RATE]}"
+    return options[ATTR_AUDIO_OUTPUT]
+
+
+def _output_extension(options: dict[str, Any]) -> str:
+    """Return the extension of the audio returned to Home Assistant."""
+    if options[ATTR_AUDIO_OUTPUT] == TTS_OUTPUT_PCM:
+        return "wav"
+    return options[ATTR_AUDIO_OUTPUT]
 
 
 class YandexStationTTSProxyEntity(TextToSpeechEntity):
@@ -209,6 +858,20 @@ class YandexStationTTSProxyEntity(TextToSpeechEntity):
 
         self._hass = hass
         self._config_entry = config_entry
+        self._queue = SpeakerDeliveryQueue(
+            hass,
+            config_entry,
+            config_entry.options[CONF_PROXY_SPEAKER],
+            config_entry.options.get(CONF_PROXY_MEDIA_TYPE, "tts"),
+            config_entry.options.get(
+                CONF_PROXY_MERGE_WINDOW, DEFAULT_PROXY_MERGE_WINDOW
+            ),
+            config_entry.options.get(CONF_PROXY_QUEUE_SIZE, DEFAULT_PROXY_QUEUE_SIZE),
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel messages that have not been delivered yet."""
+        self._queue.async_shutdown()
 
     @property
     def supported_languages(self):
@@ -245,25 +908,15 @@ class YandexStationTTSProxyEntity(TextToSpeechEntity):
         self, message: str, language: str, options: dict[str, Any]
     ) -> TtsAudioType:
         """Send text to the configured Yandex.Station."""
-        if not self._config_entry.options.get(CONF_PROXY_SPEAKER):
-            LOGGER.error("No speaker configured for Yandex.Station TTS proxy")
-            return (None, None)
-
-        LOGGER.debug("Proxying TTS request to Yandex.Station...")
-        try:
-            data = {
-                ATTR_MEDIA_CONTENT_ID: message,
-                ATTR_MEDIA_CONTENT_TYPE: self._config_entry.options.get(
-                    CONF_PROXY_MEDIA_TYPE, "tts"
-                ),
-                ATTR_ENTITY_ID: self._config_entry.options.get(CONF_PROXY_SPEAKER),
-            }
-            await self._hass.services.async_call(
-                MEDIA_DOMAIN, SERVICE_PLAY_MEDIA, data, blocking=True
-            )
-        except Exception as e:
-            LOGGER.error("Error proxying TTS request to Yandex.Station: %s", e)
-            return (None, None)
+        delivered = self._queue.async_enqueue(message)
+        if not self._config_entry.options.get(
+            CONF_PROXY_FIRE_AND_FORGET, DEFAULT_PROXY_FIRE_AND_FORGET
+        ):
+            try:
+                await asyncio.shield(delivered)
+            except Exception:  # noqa: BLE001
+                # Already logged by the delivery queue
+                return (None, None)
 
         if options.get(ATTR_VOICE) == PROXY_EMPTY_WAV:
             return await self.hass.async_add_executor_job(self._read_empty, "wav")
@@ -0,0 +1,114 @@
+"""Energy-based silence trimming for Yandex SpeechKit recognition."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterable
+
+import numpy as np
+
+FRAME_MS = 30
+PRE_ROLL_MS = 300
+MIN_SPEECH_DB = -50.0
+LOUD_SPEECH_DB = -30.0
+SPEECH_ABOVE_NOISE_DB = 12.0
+NOISE_SMOOTHING = 0.05
+# Rise of the noise level towards frames taken for speech, a time
+# constant of about 15 s at 30 ms frames
+SPEECH_NOISE_SMOOTHING = 0.002
+
+
+def frame_levels(frames: np.ndarray) -> np.ndarray:
+    """Return the RMS level in dBFS of every row of 16-bit samples."""
+    samples = frames.astype(np.float32) / 32768.0
+    rms = np.sqrt(np.mean(samples * samples, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+
+class SilenceTrimmer:
+    """Drop leading and trailing silence from 16-bit mono PCM.
+
+    Audio is cut into fixed frames and their levels are computed for all
+    complete frames of a chunk at once. A frame is speech when it is
+    louder than an absolute floor and either well above the running
+    noise level or loud in absolute terms. Frames before the first speech
+    are dropped except for a short pre-roll, and the stream ends after
+    enough trailing silence.
+    """
+
+    def __init__(self, sample_rate: int, trailing_silence_ms: int) -> None:
+        """Initialize the trimmer."""
+        self._frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+        self._pre_roll: deque[bytes] = deque(maxlen=PRE_ROLL_MS // FRAME_MS)
+        self._max_silent_frames = max(1, trailing_silence_ms // FRAME_MS)
+        self._buffer = b""
+        self._noise_db: float | None = None
+        self._speaking = False
+        self._silent_frames = 0
+        self.finished = False
+
+    def process(self, data: bytes) -> bytes:
+        """Return the part of the chunk that should be uploaded."""
+        self._buffer += data
+        count = len(self._buffer) // self._frame_bytes
+        if not count:
+            return b""
+
+        size = count * self._frame_bytes
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        frames = np.frombuffer(chunk, dtype="<i2").reshape(count, -1)
+        levels = frame_levels(frames)
+
+        output = []
+        for index, level in enumerate(levels.tolist()):
+            frame = chunk[index * self._frame_bytes : (index + 1) * self._frame_bytes]
+            is_speech = self._is_speech(level)
+
+            if not self._speaking:
+                self._pre_roll.append(frame)
+                if is_speech:
+                    self._speaking = True
+                    output.extend(self._pre_roll)
+                    self._pre_roll.clear()
+                continue
+
+            output.append(frame)
+            self._silent_frames = 0 if is_speech else self._silent_frames + 1
+            if self._silent_frames >= self._max_silent_frames:
+                self.finished = True
+                break
+
+        return b"".join(output)
+
+    def _is_speech(self, level: float) -> bool:
+        """Classify a frame and update the noise level estimate.
+
+        The noise level drops to quieter frames at once and drifts up
+        towards louder ones, slowly for noise and very slowly for speech.
+        A lasting rise of the background, like a fan turned on, thus
+        becomes the new noise level instead of never ending speech.
+        """
+        if self._noise_db is None or level < self._noise_db:
+            self._noise_db = level
+        is_speech = level > MIN_SPEECH_DB and (
+            level > self._noise_db + SPEECH_ABOVE_NOISE_DB or level > LOUD_SPEECH_DB
+        )
+        smoothing = SPEECH_NOISE_SMOOTHING if is_speech else NOISE_SMOOTHING
+        self._noise_db += smoothing * (level - self._noise_db)
+        return is_speech
+
+
+async def trim_silence(
+    stream: AsyncIterable[bytes], sample_rate: int, trailing_silence_ms: int
+) -> AsyncGenerator[bytes]:
+    """Yield 16-bit mono PCM without leading silence, ending after a pause."""
+    trimmer = SilenceTrimmer(sample_rate, trailing_silence_ms)
+    async for chunk in stream:
+        if data := trimmer.process(chunk):
+            yield data
+        if trimmer.finished:
+            break
@@ -0,0 +1 @@
+"""Tests of the Yandex SpeechKit integration."""
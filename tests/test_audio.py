@@ -0,0 +1,122 @@
+"""Tests of the audio container helpers."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import struct
+
+from custom_components.yandex_speechkit.audio import (
+    OGG_BOS,
+    OGG_EOS,
+    OGG_PAGE_HEADER,
+    AudioJoiner,
+    build_ogg_page,
+    find_wav_data,
+    join_segments,
+    ogg_crc,
+    wav_header,
+)
+
+# A 20 ms CELT frame
+OPUS_PACKET = b"\xf8" + bytes(59)
+OPUS_PACKET_SAMPLES = 960
+
+
+def _opus_segment(serial: int, packets: int) -> bytes:
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<II", 0, 0)
+    return (
+        build_ogg_page(OGG_BOS, 0, serial, 0, [head])
+        + build_ogg_page(0, 0, serial, 1, [tags])
+        + build_ogg_page(0, 2 * OPUS_PACKET_SAMPLES, serial, 2, [OPUS_PACKET] * 2)
+        + build_ogg_page(
+            OGG_EOS,
+            packets * OPUS_PACKET_SAMPLES,
+            serial,
+            3,
+            [OPUS_PACKET] * (packets - 2),
+        )
+    )
+
+
+def _ogg_pages(data: bytes) -> list[tuple[int, int, int, int, int]]:
+    """Return flags, granule, serial, page number and packets of every page."""
+    pages = []
+    offset = 0
+    while offset < len(data):
+        _, _, flags, granule, serial, sequence, crc, segments = (
+            OGG_PAGE_HEADER.unpack_from(data, offset)
+        )
+        lacing = data[offset + OGG_PAGE_HEADER.size :][:segments]
+        size = OGG_PAGE_HEADER.size + segments + sum(lacing)
+        page = bytearray(data[offset : offset + size])
+        struct.pack_into("<I", page, 22, 0)
+        assert ogg_crc(page) == crc
+        pages.append((flags, granule, serial, sequence, sum(v < 255 for v in lacing)))
+        offset += size
+    return pages
+
+
+def _stream(container: str, segments: list[bytes], chunk_size: int) -> bytes:
+    joiner = AudioJoiner(container)
+    output = []
+    for segment in segments:
+        joiner.start_segment()
+        for offset in range(0, len(segment), chunk_size):
+            output.append(joiner.feed(segment[offset : offset + chunk_size]))
+    output.append(joiner.finish())
+    return b"".join(output)
+
+
+def test_ogg_crc() -> None:
+    """The checksum matches a bitwise calculation."""
+    data = bytes(range(256)) * 3
+    crc = 0
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1
+            crc &= 0xFFFFFFFF
+    assert ogg_crc(data) == ogg_crc(bytearray(data)) == crc
+
+
+def test_single_ogg_segment_is_untouched() -> None:
+    """A single segment is passed through byte for byte."""
+    segment = _opus_segment(1, 5)
+    assert _stream("ogg", [segment], 100) == segment
+    assert join_segments("ogg", [segment]) is segment
+
+
+def test_ogg_segments_are_joined_into_one_stream() -> None:
+    """Follow-up segments continue the first stream without their pre-skip."""
+    data = _stream("ogg", [_opus_segment(1, 5), _opus_segment(2, 5)], 100)
+    pages = _ogg_pages(data)
+    assert [page[3] for page in pages] == list(range(len(pages)))
+    assert {page[2] for page in pages} == {1}
+    assert [bool(page[0] & OGG_BOS) for page in pages] == [True] + [False] * 5
+    assert [bool(page[0] & OGG_EOS) for page in pages] == [False] * 5 + [True]
+    # The packet holding the 312 samples of pre-skip is dropped
+    assert sum(page[4] for page in pages[2:]) == 9
+    assert pages[-1][1] == 9 * OPUS_PACKET_SAMPLES
+    assert data == join_segments("ogg", [_opus_segment(1, 5), _opus_segment(2, 5)])
+
+
+def test_wav_segments_are_joined() -> None:
+    """Follow-up WAV headers are dropped and the sizes filled in."""
+    first = wav_header(22050) + bytes(100)
+    second = wav_header(22050) + b"\x01" * 50
+    data = join_segments("wav", [first, second])
+    data_offset = find_wav_data(data)
+    assert data[data_offset:] == bytes(100) + b"\x01" * 50
+    assert struct.unpack_from("<I", data, 4)[0] == len(data) - 8
+    assert struct.unpack_from("<I", data, data_offset - 4)[0] == 150
+
+
+def test_mp3_tags_of_follow_up_segments_are_dropped() -> None:
+    """Only the first MP3 segment keeps its ID3 tag."""
+    tag = b"ID3\x04\x00\x00\x00\x00\x00\x05" + bytes(5)
+    frame = b"\xff\xfb\x90\x64" + bytes(413)
+    assert _stream("mp3", [tag + frame, tag + frame], 7) == tag + frame + frame
@@ -0,0 +1,110 @@
+"""Tests of the circuit breaker."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+
+import grpc
+import pytest
+from grpc import aio
+
+from custom_components.yandex_speechkit.breaker import CircuitBreaker, CircuitState
+from custom_components.yandex_speechkit.rpc import CircuitOpenError
+
+
+def _error(code: grpc.StatusCode) -> aio.AioRpcError:
+    return aio.AioRpcError(code, aio.Metadata(), aio.Metadata(), code.name)
+
+
+UNAVAILABLE = _error(grpc.StatusCode.UNAVAILABLE)
+
+
+def test_breaker_opens_and_recovers() -> None:
+    """The breaker opens after threshold failures and closes once probed."""
+
+    async def run() -> None:
+        reachable = asyncio.Event()
+        probed = asyncio.Event()
+
+        async def probe() -> None:
+            probed.set()
+            if not reachable.is_set():
+                raise UNAVAILABLE
+
+        states = []
+        breaker = CircuitBreaker("Test", 2, 0.01, probe)
+        breaker.async_add_listener(lambda: states.append(breaker.state))
+
+        breaker.record(UNAVAILABLE)
+        breaker.check()
+        # Errors from the API itself do not count as unreachable
+        breaker.record(_error(grpc.StatusCode.INVALID_ARGUMENT))
+        breaker.record(UNAVAILABLE)
+        assert breaker.state is CircuitState.CLOSED
+
+        breaker.record(UNAVAILABLE)
+        assert breaker.state is CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        # Calls failed by the breaker itself are not recorded
+        breaker.record(CircuitOpenError("open"))
+
+        await probed.wait()
+        assert breaker.state is CircuitState.OPEN
+        reachable.set()
+        while breaker.state is CircuitState.OPEN:
+            await asyncio.sleep(0.01)
+        assert breaker.state is CircuitState.HALF_OPEN
+        breaker.check()
+
+        breaker.record(None)
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.failures == 0
+        assert states == [
+            CircuitState.OPEN,
+            CircuitState.HALF_OPEN,
+            CircuitState.CLOSED,
+        ]
+        breaker.stop()
+
+    asyncio.run(run())
+
+
+def test_half_open_breaker_opens_on_first_failure() -> None:
+    """A failure while half open opens the breaker again."""
+
+    async def run() -> None:
+        async def probe() -> None:
+            pass
+
+        breaker = CircuitBreaker("Test", 3, 0.01, probe)
+        for _ in range(3):
+            breaker.record(UNAVAILABLE)
+        while breaker.state is not CircuitState.HALF_OPEN:
+            await asyncio.sleep(0.01)
+
+        breaker.record(UNAVAILABLE)
+        assert breaker.state is CircuitState.OPEN
+        breaker.stop()
+
+    asyncio.run(run())
+
+
+def test_breaker_with_no_threshold_never_opens() -> None:
+    """A threshold of 0 disables the breaker."""
+
+    async def run() -> None:
+        async def probe() -> None:
+            raise AssertionError("not probed")
+
+        breaker = CircuitBreaker("Test", 0, 0.01, probe)
+        for _ in range(10):
+            breaker.record(UNAVAILABLE)
+        assert breaker.state is CircuitState.CLOSED
+        breaker.check()
+
+    asyncio.run(run())
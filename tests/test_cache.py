@@ -0,0 +1,98 @@
+"""Tests of the phrase cache."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.yandex_speechkit.cache import YandexSpeechKitCache
+
+
+def _executor_job(func: Callable[..., Any], *args: Any) -> asyncio.Future[Any]:
+    return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _cache(tmp_path: Path, max_size: int, ttl: float = 0) -> YandexSpeechKitCache:
+    hass = SimpleNamespace(async_add_executor_job=_executor_job)
+    return YandexSpeechKitCache(hass, str(tmp_path), max_size, ttl)
+
+
+def _key(message: str) -> str:
+    return YandexSpeechKitCache.make_key(message, "alena", "ru-RU", "mp3")
+
+
+def test_keys_ignore_whitespace() -> None:
+    """Messages differing only in whitespace share an entry."""
+    assert _key(" Привет,\n мир ") == _key("Привет, мир")
+    assert _key("Привет, мир") != _key("Привет мир")
+
+
+def test_least_recently_used_phrase_is_evicted(tmp_path: Path) -> None:
+    """The cache drops the phrase read longest ago once it is full."""
+
+    async def run() -> None:
+        cache = _cache(tmp_path, 25)
+        await cache.async_load()
+        await cache.async_put(_key("first"), b"1" * 10)
+        await cache.async_put(_key("second"), b"2" * 10)
+        assert await cache.async_get(_key("first")) == b"1" * 10
+
+        await cache.async_put(_key("third"), b"3" * 10)
+        assert cache.entries == 2
+        assert cache.size == 20
+        assert await cache.async_get(_key("second")) is None
+        assert sorted(os.listdir(tmp_path)) == sorted([_key("first"), _key("third")])
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        reloaded = _cache(tmp_path, 25)
+        await reloaded.async_load()
+        assert reloaded.entries == 2
+        assert await reloaded.async_get(_key("third")) == b"3" * 10
+
+    asyncio.run(run())
+
+
+def test_expired_phrase_is_removed(tmp_path: Path) -> None:
+    """A phrase older than the ttl is a miss and is deleted."""
+
+    async def run() -> None:
+        cache = _cache(tmp_path, 100, ttl=60)
+        await cache.async_load()
+        await cache.async_put(_key("old"), b"audio")
+        assert cache.has(_key("old"))
+
+        cache._entries[_key("old")].created = time.time() - 120
+        assert not cache.has(_key("old"))
+        assert await cache.async_get(_key("old")) is None
+        assert cache.entries == 0
+        assert cache.size == 0
+        assert not os.listdir(tmp_path)
+
+    asyncio.run(run())
+
+
+def test_oversized_and_missing_phrases(tmp_path: Path) -> None:
+    """Phrases larger than the cache are not stored, lost files are forgotten."""
+
+    async def run() -> None:
+        cache = _cache(tmp_path, 10)
+        await cache.async_load()
+        await cache.async_put(_key("large"), b"x" * 11)
+        assert cache.entries == 0
+
+        await cache.async_put(_key("small"), b"x" * 5)
+        os.remove(tmp_path / _key("small"))
+        assert await cache.async_get(_key("small")) is None
+        assert cache.entries == 0
+        assert cache.size == 0
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+"""Tests of the API key pool."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import grpc
+
+from custom_components.yandex_speechkit.credentials import (
+    COOLDOWNS,
+    YandexSpeechKitCredentialPool,
+)
+
+
+def test_calls_are_spread_over_keys() -> None:
+    """Each call gets the key with the fewest calls in progress."""
+    pool = YandexSpeechKitCredentialPool(["one", "two"])
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first.label, second.label} == {"key_1", "key_2"}
+    assert second.metadata == (("authorization", "Api-Key two"),)
+
+    pool.release(first, grpc.StatusCode.OK)
+    assert pool.acquire() is first
+    pool.release(first, grpc.StatusCode.OK)
+    pool.release(second, grpc.StatusCode.OK)
+    # Keys that are equally busy are used in turn
+    assert pool.acquire() is second
+    assert [key["calls"] for key in pool.as_dict()] == [2, 2]
+
+
+def test_failed_key_cools_down() -> None:
+    """A key rejected by the API is skipped until its cooldown ends."""
+    pool = YandexSpeechKitCredentialPool(["one", "two"])
+    with patch(
+        "custom_components.yandex_speechkit.credentials.time.monotonic"
+    ) as monotonic:
+        monotonic.return_value = 1000.0
+        first = pool.acquire()
+        pool.release(first, grpc.StatusCode.RESOURCE_EXHAUSTED)
+        cooldown = COOLDOWNS[grpc.StatusCode.RESOURCE_EXHAUSTED]
+        assert pool.as_dict()[0]["cooldown"] == cooldown
+        assert pool.as_dict()[0]["status_codes"] == {"RESOURCE_EXHAUSTED": 1}
+
+        for _ in range(3):
+            second = pool.acquire()
+            assert second is not first
+            pool.release(second, grpc.StatusCode.OK)
+
+        monotonic.return_value += cooldown
+        assert pool.acquire() is first
+
+
+def test_key_coming_back_first_is_used_when_all_cool_down() -> None:
+    """With every key out of rotation, calls still go out."""
+    pool = YandexSpeechKitCredentialPool(["one", "two"])
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first, grpc.StatusCode.UNAUTHENTICATED)
+    pool.release(second, grpc.StatusCode.RESOURCE_EXHAUSTED)
+    assert pool.acquire() is second
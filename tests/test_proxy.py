@@ -0,0 +1,116 @@
+"""Tests of the Yandex.Station delivery queue."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from homeassistant.components.media_player.const import ATTR_MEDIA_CONTENT_ID
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.yandex_speechkit.proxy import (
+    SpeakerDeliveryQueue,
+    merge_messages,
+)
+
+
+def _queue(
+    played: list[str], merge_window: float, max_size: int = 10
+) -> SpeakerDeliveryQueue:
+    async def async_call(
+        domain: str, service: str, data: dict[str, Any], blocking: bool
+    ) -> None:
+        played.append(data[ATTR_MEDIA_CONTENT_ID])
+        await asyncio.sleep(0)
+
+    def create_task(
+        hass: Any, target: Coroutine[Any, Any, None], name: str
+    ) -> asyncio.Task[None]:
+        return asyncio.create_task(target)
+
+    hass = SimpleNamespace(services=SimpleNamespace(async_call=async_call))
+    entry = SimpleNamespace(async_create_background_task=create_task)
+    return SpeakerDeliveryQueue(
+        hass, entry, "media_player.station", "text", merge_window, max_size
+    )
+
+
+def test_merge_messages() -> None:
+    """Messages are joined as sentences."""
+    assert merge_messages(["Привет"]) == "Привет"
+    assert merge_messages(["Дверь открыта", " Окно открыто! ", ""]) == (
+        "Дверь открыта. Окно открыто!"
+    )
+
+
+def test_messages_within_the_window_are_merged() -> None:
+    """Messages arriving together are spoken as one utterance."""
+
+    async def run() -> None:
+        played: list[str] = []
+        queue = _queue(played, 0.05)
+        first = queue.async_enqueue("Дверь открыта")
+        second = queue.async_enqueue("Окно открыто")
+        assert queue.async_enqueue("Дверь открыта") is first
+        await asyncio.gather(first, second)
+        assert played == ["Дверь открыта. Окно открыто."]
+
+    asyncio.run(run())
+
+
+def test_messages_are_delivered_one_at_a_time() -> None:
+    """Without a merge window, duplicates of playing messages are dropped."""
+
+    async def run() -> None:
+        played: list[str] = []
+        queue = _queue(played, 0)
+        first = queue.async_enqueue("Дверь открыта")
+        await asyncio.sleep(0)
+        assert queue.async_enqueue("Дверь открыта") is first
+        second = queue.async_enqueue("Окно открыто")
+        await asyncio.gather(first, second)
+        assert played == ["Дверь открыта", "Окно открыто"]
+
+        # Delivered messages can be sent again
+        await queue.async_enqueue("Дверь открыта")
+        assert played[-1] == "Дверь открыта"
+
+    asyncio.run(run())
+
+
+def test_full_queue_drops_the_oldest_message() -> None:
+    """The oldest pending message gives way to a new one."""
+
+    async def run() -> None:
+        played: list[str] = []
+        queue = _queue(played, 0.05, max_size=2)
+        first = queue.async_enqueue("Один")
+        queue.async_enqueue("Два")
+        third = queue.async_enqueue("Три")
+        with pytest.raises(HomeAssistantError):
+            await first
+        await third
+        assert played == ["Два. Три."]
+
+    asyncio.run(run())
+
+
+def test_shutdown_fails_pending_messages() -> None:
+    """Messages still waiting are cancelled on shutdown."""
+
+    async def run() -> None:
+        queue = _queue([], 1)
+        message = queue.async_enqueue("Дверь открыта")
+        await asyncio.sleep(0)
+        queue.async_shutdown()
+        with pytest.raises(HomeAssistantError):
+            await message
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""Tests of the SpeechKit call scheduler."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.yandex_speechkit.metrics import YandexSpeechKitMetrics
+from custom_components.yandex_speechkit.scheduler import (
+    Priority,
+    YandexSpeechKitScheduler,
+)
+
+
+async def _call(scheduler: YandexSpeechKitScheduler) -> None:
+    async with scheduler.slot(Priority.NORMAL):
+        pass
+
+
+def test_waits_for_refill_when_idle() -> None:
+    """A call queued while no call runs is admitted once a token refills."""
+
+    async def run() -> None:
+        scheduler = YandexSpeechKitScheduler(YandexSpeechKitMetrics(), 2, 10)
+        await _call(scheduler)
+        await _call(scheduler)
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(_call(scheduler), 1)
+        # Later calls must not queue up behind a stuck one
+        await asyncio.wait_for(_call(scheduler), 1)
+
+    asyncio.run(run())
+
+
+def test_priority_order() -> None:
+    """Waiting calls are admitted by priority, then in arrival order."""
+
+    async def run() -> None:
+        scheduler = YandexSpeechKitScheduler(YandexSpeechKitMetrics(), 0, 1)
+        order: list[str] = []
+        running = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with scheduler.slot(Priority.NORMAL):
+                running.set()
+                await release.wait()
+
+        async def call(name: str, priority: Priority) -> None:
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        holder = asyncio.create_task(hold())
+        await running.wait()
+        calls = [
+            asyncio.create_task(call("bulk", Priority.BULK)),
+            asyncio.create_task(call("normal", Priority.NORMAL)),
+            asyncio.create_task(call("interactive", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, *calls)
+        assert order == ["interactive", "normal", "bulk"]
+
+    asyncio.run(run())
+
+
+def test_try_acquire_respects_limits() -> None:
+    """A turn is only taken right away when the limits have room for it."""
+
+    async def run() -> None:
+        scheduler = YandexSpeechKitScheduler(YandexSpeechKitMetrics(), 0, 2)
+        assert scheduler.try_acquire()
+        assert scheduler.try_acquire()
+        assert not scheduler.try_acquire()
+        scheduler.release()
+        assert scheduler.try_acquire()
+
+        limited = YandexSpeechKitScheduler(YandexSpeechKitMetrics(), 1, 10)
+        assert limited.try_acquire()
+        assert not limited.try_acquire()
+
+    asyncio.run(run())
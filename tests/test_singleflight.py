@@ -0,0 +1,94 @@
+"""Tests of the deduplication of concurrent identical requests."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+
+import pytest
+
+from custom_components.yandex_speechkit.singleflight import SingleFlight
+
+
+async def _collect(
+    flight: SingleFlight, factory: Callable[[], AsyncIterator[int]]
+) -> list[int]:
+    return [item async for item in flight.stream("key", factory)]
+
+
+def test_late_joiner_gets_all_items() -> None:
+    """A consumer joining a stream in progress gets every item once."""
+
+    async def run() -> None:
+        flight = SingleFlight()
+        calls = 0
+
+        async def numbers() -> AsyncGenerator[int]:
+            nonlocal calls
+            calls += 1
+            for number in range(5):
+                await asyncio.sleep(0.01)
+                yield number
+
+        first = asyncio.create_task(_collect(flight, numbers))
+        await asyncio.sleep(0.025)
+        second = asyncio.create_task(_collect(flight, numbers))
+        assert await first == await second == list(range(5))
+        assert calls == 1
+        assert not flight
+
+    asyncio.run(run())
+
+
+def test_error_reaches_every_consumer() -> None:
+    """An exception of the stream is raised in every consumer."""
+
+    async def run() -> None:
+        flight = SingleFlight()
+
+        async def failing() -> AsyncGenerator[int]:
+            yield 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            _collect(flight, failing), _collect(flight, failing), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(run())
+
+
+def test_cancelled_only_without_consumers() -> None:
+    """The stream keeps running until its last consumer leaves."""
+
+    async def run() -> None:
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def endless() -> AsyncGenerator[int]:
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield 0
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        consumers = [asyncio.create_task(_collect(flight, endless)) for _ in range(2)]
+        await asyncio.sleep(0.03)
+        consumers[0].cancel()
+        await asyncio.sleep(0.03)
+        assert not cancelled.is_set()
+        consumers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert not flight
+        for consumer in consumers:
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+
+    asyncio.run(run())
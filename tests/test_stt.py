@@ -0,0 +1,123 @@
+"""Tests of the STT entity against a local stand-in server."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator
+
+import yandex.cloud.ai.stt.v3.stt_pb2 as stt_pb2
+import yandex.cloud.ai.stt.v3.stt_service_pb2_grpc as stt_service_pb2_grpc
+from grpc import aio
+from homeassistant.components.stt import (
+    AudioBitRates,
+    AudioChannels,
+    AudioCodecs,
+    AudioFormats,
+    AudioSampleRates,
+    SpeechMetadata,
+    SpeechResultState,
+)
+
+from benchmarks.run import create_config_entry
+from custom_components.yandex_speechkit.const import DEFAULT_LANG
+from custom_components.yandex_speechkit.stt import YandexSpeechKitSTTEntity
+
+METADATA = SpeechMetadata(
+    language=DEFAULT_LANG,
+    format=AudioFormats.WAV,
+    codec=AudioCodecs.PCM,
+    bit_rate=AudioBitRates.BITRATE_16,
+    sample_rate=AudioSampleRates.SAMPLERATE_16000,
+    channel=AudioChannels.CHANNEL_MONO,
+)
+# 20 ms of 16 kHz audio
+FRAME = bytes(640)
+
+
+class EarlyRecognizer(stt_service_pb2_grpc.RecognizerServicer):
+    """Report the end of the utterance while audio is still arriving."""
+
+    def __init__(self) -> None:
+        """Initialize the servicer."""
+        self.cancelled = asyncio.Event()
+
+    async def RecognizeStreaming(
+        self,
+        request_iterator: AsyncIterator[stt_pb2.StreamingRequest],
+        context: aio.ServicerContext,
+    ) -> AsyncGenerator[stt_pb2.StreamingResponse]:
+        """Send the final result after a few chunks, refined a bit later."""
+        context.add_done_callback(lambda _: self.cancelled.set())
+        cursors = stt_pb2.AudioCursors(final_index=0)
+        chunks = 0
+        async for request in request_iterator:
+            if request.WhichOneof("Event") != "chunk":
+                continue
+            chunks += 1
+            if chunks == 3:
+                yield stt_pb2.StreamingResponse(
+                    audio_cursors=cursors,
+                    final=stt_pb2.AlternativeUpdate(
+                        alternatives=[stt_pb2.Alternative(text="включи свет")]
+                    ),
+                )
+                yield stt_pb2.StreamingResponse(
+                    audio_cursors=cursors, eou_update=stt_pb2.EouUpdate()
+                )
+            elif chunks == 6:
+                yield stt_pb2.StreamingResponse(
+                    audio_cursors=cursors,
+                    final_refinement=stt_pb2.FinalRefinement(
+                        final_index=0,
+                        normalized_text=stt_pb2.AlternativeUpdate(
+                            alternatives=[stt_pb2.Alternative(text="Включи свет")]
+                        ),
+                    ),
+                )
+
+
+def test_recognition_stops_at_end_of_utterance() -> None:
+    """The call ends once the utterance is refined, not when audio ends."""
+
+    async def run() -> None:
+        recognizer = EarlyRecognizer()
+        server = aio.server()
+        stt_service_pb2_grpc.add_RecognizerServicer_to_server(recognizer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        entry = create_config_entry(f"127.0.0.1:{port}", {}, 0, 10)
+        entity = YandexSpeechKitSTTEntity(entry, False)
+
+        frames = 0
+        closed = asyncio.Event()
+
+        async def endless_audio() -> AsyncGenerator[bytes]:
+            nonlocal frames
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    frames += 1
+                    yield FRAME
+            finally:
+                closed.set()
+
+        audio = endless_audio()
+        try:
+            result = await asyncio.wait_for(
+                entity.async_process_audio_stream(METADATA, audio), 10
+            )
+            assert result.result is SpeechResultState.SUCCESS
+            assert result.text == "Включи свет"
+            await asyncio.wait_for(recognizer.cancelled.wait(), 5)
+            await audio.aclose()
+            assert closed.is_set()
+            assert frames < 100
+        finally:
+            await entry.runtime_data.channels.async_close()
+            await server.stop(None)
+
+    asyncio.run(run())
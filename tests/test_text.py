@@ -0,0 +1,53 @@
+"""Tests of text segmentation."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from custom_components.yandex_speechkit.text import (
+    MAX_SEGMENT_LENGTH,
+    SegmentSplitter,
+    split_text,
+)
+
+
+def test_short_text_is_one_segment() -> None:
+    """Text that fits into one request is not split into sentences."""
+    text = "Стиральная машина закончила. Выньте бельё! Температура 21.0°."
+    assert split_text(text) == [text]
+    assert split_text("  ") == []
+
+
+def test_sentences_are_packed() -> None:
+    """Long text is packed into as few segments of whole sentences as fit."""
+    segments = split_text("Hi. " * 100)
+    assert len(segments) == 2
+    assert all(len(segment) <= MAX_SEGMENT_LENGTH for segment in segments)
+    assert " ".join(segments) == ("Hi. " * 100).strip()
+
+
+def test_long_sentence_is_cut() -> None:
+    """A sentence longer than a segment is cut at clause boundaries."""
+    sentence = ", ".join(["слово"] * 60) + "."
+    segments = split_text(f"Начало. {sentence}")
+    assert segments[0] == "Начало."
+    assert all(len(segment) <= MAX_SEGMENT_LENGTH for segment in segments)
+    assert " ".join(segments[1:]) == sentence
+
+
+def test_streamed_text_is_packed_like_split_text() -> None:
+    """A message arriving in one chunk goes out as split_text splits it."""
+    text = "Стиральная машина закончила. Выньте бельё!"
+    splitter = SegmentSplitter()
+    assert splitter.feed(text) == []
+    assert splitter.flush() == split_text(text) == [text]
+
+
+def test_streamed_sentences_are_sent_as_text_arrives() -> None:
+    """Sentences completed by a chunk are sent once the next one arrives."""
+    splitter = SegmentSplitter()
+    assert splitter.feed("Первое. Второе. Тре") == []
+    assert splitter.feed("тье.") == ["Первое. Второе."]
+    assert splitter.flush() == ["Третье."]
@@ -0,0 +1,134 @@
+"""Tests of the TTS entity against a local stand-in server."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from homeassistant.components.tts import (
+    ATTR_AUDIO_OUTPUT,
+    ATTR_VOICE,
+    TTSAudioRequest,
+)
+
+from benchmarks.fake_server import FakeServerConfig, start_fake_server
+from benchmarks.run import create_config_entry
+from custom_components.yandex_speechkit.cache import YandexSpeechKitCache
+from custom_components.yandex_speechkit.const import (
+    CONF_TTS_NORMALIZE,
+    DEFAULT_LANG,
+    DEFAULT_VOICE,
+)
+from custom_components.yandex_speechkit.tts import (
+    SPOOL_READ_SIZE,
+    YandexSpeechKitTTSEntity,
+)
+
+MESSAGE = "Стиральная машина  закончила. Выньте бельё!!"
+OPTIONS = {ATTR_VOICE: DEFAULT_VOICE, ATTR_AUDIO_OUTPUT: "mp3"}
+
+
+def _executor_job(func: Callable[..., Any], *args: Any) -> asyncio.Future[Any]:
+    return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def _message() -> AsyncGenerator[str]:
+    yield MESSAGE
+
+
+def _spooling_entity() -> YandexSpeechKitTTSEntity:
+    entry = SimpleNamespace(entry_id="test", title="Test", options={})
+    entity = YandexSpeechKitTTSEntity(entry)
+    entity.hass = SimpleNamespace(async_add_executor_job=_executor_job)
+    return entity
+
+
+def test_preloaded_phrase_is_streamed_from_cache(tmp_path: Path) -> None:
+    """Streamed playback of a preloaded phrase makes no API call."""
+
+    async def run() -> None:
+        server, address = await start_fake_server(
+            FakeServerConfig(first_chunk_latency=0, chunk_latency=0)
+        )
+        entry = create_config_entry(address, {CONF_TTS_NORMALIZE: True}, 0, 10)
+        hass = SimpleNamespace(async_add_executor_job=_executor_job)
+        cache = YandexSpeechKitCache(hass, str(tmp_path), 1024 * 1024, 0)
+        await cache.async_load()
+        entry.runtime_data.cache = cache
+        entity = YandexSpeechKitTTSEntity(entry)
+        entity.hass = hass
+        metrics = entry.runtime_data.metrics
+        try:
+            result = await entity.async_preload([MESSAGE], DEFAULT_LANG, OPTIONS, 2, 0)
+            assert result["synthesized"] == 1
+            calls = metrics.tts_total.count
+
+            response = await entity.async_stream_tts_audio(
+                TTSAudioRequest(
+                    language=DEFAULT_LANG, options=OPTIONS, message_gen=_message()
+                )
+            )
+            assert b"".join([chunk async for chunk in response.data_gen])
+            assert metrics.tts_total.count == calls
+            assert cache.misses == 1
+        finally:
+            await entry.runtime_data.channels.async_close()
+            await server.stop(None)
+
+    asyncio.run(run())
+
+
+def test_spool_is_read_back_as_written() -> None:
+    """Spooled audio is read back unchanged, in bounded chunks."""
+
+    async def run() -> None:
+        data = bytes(range(256)) * 4096
+        sizes = [1, 100, 70000, 300000, 5, 200000] * 3
+
+        async def audio() -> AsyncGenerator[bytes]:
+            offset = 0
+            for index, size in enumerate(sizes):
+                yield data[offset : offset + size]
+                offset += size
+                if index % 2:
+                    # Let playback catch up with synthesis
+                    await asyncio.sleep(0.01)
+            yield data[offset:]
+
+        chunks = [chunk async for chunk in _spooling_entity()._read_back_spool(audio())]
+        assert b"".join(chunks) == data
+        assert max(map(len, chunks)) <= SPOOL_READ_SIZE
+
+    asyncio.run(run())
+
+
+def test_spool_stops_synthesis_when_closed() -> None:
+    """Closing spooled playback early closes the audio and its tasks."""
+
+    async def run() -> None:
+        closed = asyncio.Event()
+
+        async def audio() -> AsyncGenerator[bytes]:
+            try:
+                while True:
+                    yield bytes(SPOOL_READ_SIZE)
+                    await asyncio.sleep(0)
+            finally:
+                closed.set()
+
+        spooled = _spooling_entity()._spool_audio(audio(), lambda: True)
+        # The first chunk is passed through, the second read back
+        assert len(await anext(spooled)) == SPOOL_READ_SIZE
+        assert len(await anext(spooled)) == SPOOL_READ_SIZE
+        await spooled.aclose()
+        assert closed.is_set()
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(run())
@@ -0,0 +1,41 @@
+"""Tests of the silence trimmer."""
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+import numpy as np
+
+from custom_components.yandex_speechkit.vad import SilenceTrimmer
+
+SAMPLE_RATE = 16000
+
+
+def _noise(seconds: float, amplitude: float) -> bytes:
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, amplitude, int(SAMPLE_RATE * seconds))
+    return samples.astype("<i2").tobytes()
+
+
+def _tone(seconds: float) -> bytes:
+    samples = np.sin(np.arange(int(SAMPLE_RATE * seconds)) * 0.2) * 5000
+    return samples.astype("<i2").tobytes()
+
+
+def test_speech_is_trimmed() -> None:
+    """Leading silence is dropped and the stream ends after a pause."""
+    trimmer = SilenceTrimmer(SAMPLE_RATE, 600)
+    output = trimmer.process(_noise(1, 30) + _tone(1) + _noise(2, 30))
+    assert trimmer.finished
+    assert 1.5 < len(output) / 2 / SAMPLE_RATE < 2
+
+
+def test_noise_level_follows_rising_background() -> None:
+    """A lasting louder background ends up counted as noise."""
+    trimmer = SilenceTrimmer(SAMPLE_RATE, 600)
+    trimmer.process(_noise(1, 30) + _tone(1))
+    # Well above the quiet start, but below loud speech
+    trimmer.process(_noise(30, 300))
+    assert trimmer.finished